@@ -0,0 +1,109 @@
+"""
+Compare CommandMatcher with the alternation regex it replaced in on_message.
+
+    python benchmarks/dispatch_matcher.py [message count]
+"""
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from dispatch import CommandMatcher  # noqa: E402
+
+USER_ID = 349920059549941761
+
+COMMAND_NAMES = [
+    'ping', 'help', 'dashboard', 'info', 'donate', 'timezone', 'lang', 'clock', 'todo', 'todoc', 'todos',
+    'todo user', 'todo channel', 'todo server', 'natural', 'n', '', 'remind', 'r', 'interval', 'timer', 'del', 'look',
+    'alias', 'a', 'prefix', 'blacklist', 'restrict', 'offset', 'nudge', 'pause',
+]
+
+WORDS = [
+    'the', 'a', 'remind', 'me', 'to', 'lol', 'ok', 'what', 'is', 'natural', 'n', 'timer', 'help', 'in', 'minutes',
+    'tomorrow', 'at', 'send', 'hey', 'everyone', 'look', 'at', 'this', 'https://example.com/x', ':)', 'rip', 'gg',
+]
+
+COMMANDS = [
+    'remind 10m take the bread out', 'natural in 2 hours send check the oven', 'n tomorrow at 9am send standup',
+    'help', 'todo', 'todo add buy milk', 'look', 'del', 'timer start', 'clock 12', 'timezone Europe/London',
+    ' in 5 minutes send stretch',
+]
+
+
+def build_corpus(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    corpus = []
+
+    for _ in range(size):
+        roll = rng.random()
+
+        if roll < 0.90:
+            # ordinary chatter; a handful of it begins with punctuation that looks like a prefix
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+            if rng.random() < 0.05:
+                text = rng.choice('!?.$>*') + text
+            corpus.append((text, '$'))
+
+        elif roll < 0.96:
+            corpus.append(('$' + rng.choice(COMMANDS), '$'))
+
+        elif roll < 0.98:
+            corpus.append(('!!' + rng.choice(COMMANDS), '!!'))
+
+        else:
+            corpus.append(('<@{}> {}'.format(USER_ID, rng.choice(COMMANDS)), '$'))
+
+    return corpus
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    corpus = build_corpus(size)
+
+    joined_names = '|'.join(sorted(COMMAND_NAMES, key=len, reverse=True))
+    match_string = r'(?:(?:<@ID>\s*)|(?:<@!ID>\s*)|(?P<prefix>\S{1,5}?))(?P<cmd>COMMANDS)(?:$|\s+(?P<args>.*))' \
+        .replace('ID', str(USER_ID)).replace('COMMANDS', joined_names)
+    flags = re.MULTILINE | re.DOTALL | re.IGNORECASE
+
+    matcher = CommandMatcher(COMMAND_NAMES, USER_ID)
+
+    def run_regex():
+        accepted = 0
+        for content, prefix in corpus:
+            match = re.match(match_string, content, flags)
+            if match is not None and match.group('prefix') in (prefix, None):
+                accepted += 1
+        return accepted
+
+    def run_matcher(known_prefix: bool):
+        accepted = 0
+        for content, prefix in corpus:
+            match = matcher.match(content, prefix if known_prefix else None)
+            if match is not None and match.prefix in (prefix, None):
+                accepted += 1
+        return accepted
+
+    # the engines must accept exactly the same messages with the same triple
+    for content, prefix in corpus:
+        old = re.match(match_string, content, flags)
+        old = None if old is None else (old.group('prefix'), old.group('cmd').lower(), old.group('args'))
+        new = matcher.match(content)
+        assert old == (None if new is None else tuple(new)), content
+
+    accepted = run_regex()
+    assert accepted == run_matcher(False) == run_matcher(True)
+
+    print('{} messages, {} accepted as commands'.format(size, accepted))
+
+    for name, method in (('regex', run_regex),
+                         ('matcher (no prefix)', lambda: run_matcher(False)),
+                         ('matcher (guild prefix)', lambda: run_matcher(True))):
+        best = min(timeit.repeat(method, number=1, repeat=5))
+        print('{:<24} {:>8.3f}s  {:>8.0f} ns/message'.format(name, best, best / size * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+"""
+Check fast_parse against dateparser over a corpus of natural times, then time both on the phrases it handles.
+
+    python benchmarks/natural_fast_path.py [corpus size]
+
+Every phrase in the corpus must come out exactly as dateparser has it, unless it runs into one of the places below
+where fast_parse deliberately differs. Which ones apply is decided from the phrase, timezone and base alone. Those
+phrases must instead come out exactly as the reference has them: dateparser reading the phrase on the wall clock in
+UTC, where none of its quirks apply, with pytz placing the result in the timezone. Each difference also has a named
+case in INTENDED, holding the answer fast_parse must give and dateparser doesn't:
+
+* dst: dateparser applies the base's UTC offset to the result, so 'tomorrow at 9am' across a DST change lands an
+  hour out. fast_parse uses the offset in force at the result (except for seconds/minutes/hours, which are elapsed
+  time either way)
+* clock: when deciding whether a clock time has already passed today, dateparser compares it against the base shifted
+  by the timezone's UTC offset, so outside UTC 'at 7pm' can mean tomorrow at 6pm, or today after it has gone
+* month end: on the last day of a month, dateparser rolls 'at 7:30' over to the 1st of the same month, even in UTC,
+  so the corpus's bases avoid month ends and only INTENDED covers it
+* ambiguous: in the hour that repeats when clocks go back, dateparser takes the first occurrence, or raises, and
+  fast_parse takes the second
+"""
+import os
+import random
+import sys
+import timeit
+from datetime import datetime
+
+import dateparser
+import pytz
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from natural_parser import fast_parse, UNITS, WEEKDAYS, CLOCK_REGEX, RELATIVE_REGEX  # noqa: E402
+
+TIMEZONES = ['UTC', 'Europe/London', 'America/New_York', 'Asia/Kolkata', 'Australia/Sydney']
+TO_TIMEZONES = ['UTC', 'Europe/Berlin']
+
+# ordinary times, times on the minute, either side of DST changes in the timezones above, and leap days
+BASES = [
+    datetime(2026, 10, 18, 15, 30, 12), datetime(2026, 10, 21, 18, 0, 5), datetime(2026, 6, 1, 9, 0, 0),
+    datetime(2026, 1, 30, 23, 59, 30), datetime(2026, 10, 24, 23, 40, 1), datetime(2026, 10, 25, 0, 30, 0),
+    datetime(2026, 3, 28, 22, 15, 45), datetime(2026, 3, 7, 21, 0, 0), datetime(2026, 10, 30, 23, 10, 0),
+    datetime(2026, 4, 4, 20, 0, 0), datetime(2024, 2, 28, 12, 0, 0), datetime(2026, 12, 30, 23, 59, 59),
+]
+
+# (name, phrase, timezone, to timezone, base, what fast_parse gives)
+INTENDED = [
+    ('dst', 'tomorrow at 9am', 'Europe/London', 'UTC', datetime(2026, 10, 24, 12, 0, 0),
+     datetime(2026, 10, 25, 9, 0, 0)),
+    ('dst, relative', 'in 10 weeks', 'Australia/Sydney', 'Europe/Berlin', datetime(2026, 3, 28, 22, 15, 45),
+     datetime(2026, 6, 6, 14, 15, 45)),
+    ('clock, passed', 'at 7pm', 'America/New_York', 'UTC', datetime(2026, 10, 18, 22, 30, 0),
+     datetime(2026, 10, 19, 23, 0, 0)),
+    ('clock, to come', 'at 5 PM', 'Asia/Kolkata', 'Europe/Berlin', datetime(2026, 10, 18, 15, 30, 12),
+     datetime(2026, 10, 18, 13, 30, 0)),
+    ('month end', 'at 7:30', 'UTC', 'UTC', datetime(2026, 1, 31, 12, 0, 0),
+     datetime(2026, 2, 1, 7, 30, 0)),
+    ('ambiguous', 'tomorrow at 1:59', 'Europe/London', 'UTC', datetime(2026, 10, 24, 23, 40, 1),
+     datetime(2026, 10, 25, 1, 59, 0)),
+    ('ambiguous, dateparser raises', 'at 1:00', 'Europe/London', 'UTC', datetime(2026, 10, 25, 0, 30, 0),
+     datetime(2026, 10, 25, 1, 0, 0)),
+]
+
+ELAPSED = ('seconds', 'minutes', 'hours')
+
+UNHANDLED = [
+    'next friday', 'in 1 hour 30 minutes', 'at noon', 'tomorrow evening', 'in 2 wks', 'in 3 yrs', 'at 5',
+    'at 17', 'thurs', 'friday at 5pm', 'in 1.5 hours', '01/02/2027', 'christmas', 'half past 4', 'in 10 mins time',
+]
+
+
+def phrases():
+    for count in (0, 1, 2, 5, 10, 30, 45, 90, 1000):
+        for unit in UNITS:
+            yield 'in {} {}'.format(count, unit)
+            yield 'in {}{}'.format(count, unit)
+
+    for unit in ('second', 'minute', 'hour', 'day', 'week', 'month', 'year'):
+        yield 'in a {}'.format(unit)
+        yield 'in an {}'.format(unit)
+
+    yield 'tomorrow'
+    yield 'Tomorrow'
+
+    for hour in range(0, 24):
+        for minute in ('00', '05', '30', '59'):
+            yield 'at {}:{}'.format(hour, minute)
+            yield '{:02}:{}'.format(hour, minute)
+            yield 'tomorrow at {}:{}'.format(hour, minute)
+
+    for hour in range(1, 13):
+        for meridiem in ('am', 'pm', ' PM'):
+            yield 'at {}{}'.format(hour, meridiem)
+            yield '{}:15{}'.format(hour, meridiem)
+            yield 'at {}{} tomorrow'.format(hour, meridiem)
+            yield 'tomorrow {}{}'.format(hour, meridiem)
+
+    yield 'at 9:30:15'
+
+    for weekday in WEEKDAYS:
+        yield weekday
+        yield 'on {}'.format(weekday)
+
+    for date in ('2026-11-01', '2027-02-28', '2026-11-01 10:00', '2026-11-01T10:00', '2026-11-01 10:00:30',
+                 '2025-01-01', '2026-02-30', '2026-13-01'):
+        yield date
+
+    yield from UNHANDLED
+
+
+def build_corpus(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    everything = list(phrases())
+
+    return [(rng.choice(everything), rng.choice(TIMEZONES), rng.choice(TO_TIMEZONES), rng.choice(BASES))
+            for _ in range(size)]
+
+
+def normalize(phrase):
+    return ' '.join(phrase.lower().split())
+
+
+def slow_parse(phrase, timezone, to_timezone, base):
+    return dateparser.parse(phrase, settings={
+        'TIMEZONE': timezone,
+        'TO_TIMEZONE': to_timezone,
+        'RELATIVE_BASE': base,
+        'PREFER_DATES_FROM': 'future'
+    })
+
+
+def reference_parse(phrase, timezone, to_timezone, base):
+    wall = slow_parse(phrase, 'UTC', 'UTC', base)
+
+    if wall is None:
+        return None
+
+    zone = pytz.timezone(timezone)
+
+    # seconds, minutes and hours are elapsed time, so a DST change in between doesn't stretch them
+    if (match := RELATIVE_REGEX.fullmatch(normalize(phrase))) and UNITS[match.group('unit')] in ELAPSED:
+        result = zone.localize(base) + (wall - base)
+
+    else:
+        result = zone.localize(wall)
+
+    return result.astimezone(pytz.timezone(to_timezone)).replace(tzinfo=None)
+
+
+def quirks(phrase, timezone, base):
+    """
+    The places fast_parse deliberately differs from dateparser that this phrase, timezone and base run into
+    """
+    zone = pytz.timezone(timezone)
+    normalized = normalize(phrase)
+    base_offset = zone.localize(base).utcoffset()
+    found = []
+
+    if CLOCK_REGEX.fullmatch(normalized) and 'tomorrow' not in normalized and base_offset:
+        found.append('clock')
+
+    wall = slow_parse(phrase, 'UTC', 'UTC', base)
+    match = RELATIVE_REGEX.fullmatch(normalized)
+
+    if wall is not None and not (match and UNITS[match.group('unit')] in ELAPSED):
+        try:
+            if zone.localize(wall, is_dst=None).utcoffset() != base_offset:
+                found.append('dst')
+
+        except pytz.exceptions.AmbiguousTimeError:
+            found.append('ambiguous')
+
+        except pytz.exceptions.NonExistentTimeError:
+            found.append('dst')
+
+    return found
+
+
+def check_intended():
+    """
+    Names the INTENDED cases fast_parse gets wrong, and those dateparser now agrees with, which no longer belong there
+    """
+    failures = []
+
+    for name, phrase, timezone, to_timezone, base, expected in INTENDED:
+        if fast_parse(phrase, timezone, to_timezone, base) != expected:
+            failures.append(name)
+            continue
+
+        try:
+            slow = slow_parse(phrase, timezone, to_timezone, base)
+
+        except pytz.exceptions.InvalidTimeError:
+            slow = None
+
+        if slow == expected:
+            failures.append('{} (dateparser agrees)'.format(name))
+
+    return failures
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    corpus = build_corpus(size)
+
+    handled = [entry for entry in corpus if fast_parse(*entry) is not None]
+    mismatches = []
+    differences = {}
+
+    for entry in handled:
+        phrase, timezone, to_timezone, base = entry
+
+        if found := quirks(phrase, timezone, base):
+            expected, against = reference_parse(*entry), 'reference'
+
+            for reason in found:
+                differences[reason] = differences.get(reason, 0) + 1
+
+        else:
+            expected, against = slow_parse(*entry), 'dateparser'
+
+        if (fast := fast_parse(*entry)) != expected:
+            mismatches.append((entry, fast, against, expected))
+
+    for entry, fast, against, expected in mismatches[:20]:
+        print('mismatch: {!r} {} {} base {}: fast {} {} {}'.format(*entry, fast, against, expected))
+
+    failures = check_intended()
+
+    for name in failures:
+        print('intended difference failed: {}'.format(name))
+
+    print('{} phrases, {} handled by the fast path, {} mismatches'.format(size, len(handled), len(mismatches)))
+    print('checked against the reference: {}'.format(
+        ', '.join('{} {}'.format(n, reason) for reason, n in sorted(differences.items())) or 'none'))
+    print('{} intended differences, {} failed'.format(len(INTENDED), len(failures)))
+
+    for name, method in (('dateparser', slow_parse), ('fast path', fast_parse)):
+        best = min(timeit.repeat(lambda: [method(*entry) for entry in handled], number=1, repeat=3))
+        print('{:<12} {:>8.3f}s  {:>8.1f} us/phrase'.format(name, best, best / len(handled) * 1e6))
+
+    assert not mismatches and not failures
+
+
+if __name__ == '__main__':
+    main()
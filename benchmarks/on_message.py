@@ -0,0 +1,266 @@
+"""
+Drive BotClient.on_message with stand-in Discord objects against a throwaway SQLite database.
+
+    python benchmarks/on_message.py [messages per scenario] [seeded reminders per channel]
+
+Needs the bot's own dependencies installed, but no Discord connection and no MySQL server. Reports throughput,
+latency percentiles and SQL queries per message for each scenario, followed by the bot's own command stats.
+"""
+import itertools
+import os
+import re
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from time import perf_counter
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.dialects.mysql import ENUM, MEDIUMINT
+from sqlalchemy.ext.compiler import compiles
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+BOT_ID = 349920059549941761
+GUILD_ID = 500000000000000000
+
+SCENARIOS = (
+    ('prefix miss', 'anyone know when the next event starts?'),
+    ('help', '$help'),
+    ('look', '$look'),
+    ('del', '$del'),
+    ('remind', '$remind 10m take a break'),
+    ('natural', '$natural in 2 hours send stretch'),
+    ('natural x3', '$natural in 2 hours send stretch to {channels}'),
+    ('every', '$natural in 2 hours send stretch every 2 days'),
+)
+
+# the natural command splits on these, so they need their real values
+STRING_VALUES = {
+    'natural/send': 'send',
+    'natural/to': 'to',
+    'natural/every': 'every',
+}
+
+
+# the models use MySQL column types; give SQLite something it understands
+@compiles(ENUM, 'sqlite')
+def _compile_enum(type_, compiler, **kw):
+    return 'VARCHAR({})'.format(max(len(value) for value in type_.enums))
+
+
+@compiles(MEDIUMINT, 'sqlite')
+def _compile_mediumint(type_, compiler, **kw):
+    return 'INTEGER'
+
+
+class Permissions:
+    # the bot and every member may do anything, so no scenario stops at a permission check
+    def __getattr__(self, item):
+        return True
+
+
+PERMISSIONS = Permissions()
+IDS = itertools.count(600000000000000000)
+
+
+class FakeWebhook:
+    def __init__(self):
+        self.id = next(IDS)
+        self.token = 'x' * 64
+
+
+class FakeDMChannel:
+    def __init__(self):
+        self.id = next(IDS)
+
+
+class FakeMember:
+    def __init__(self, name: str):
+        self.id = next(IDS)
+        self.name = name
+        self.discriminator = '0001'
+        self.bot = False
+        self.roles = []
+        self.guild_permissions = PERMISSIONS
+
+    async def create_dm(self):
+        return FakeDMChannel()
+
+
+class FakeChannel:
+    def __init__(self, guild, name: str):
+        self.id = next(IDS)
+        self.name = name
+        self.guild = guild
+        self.mention = '<#{}>'.format(self.id)
+
+        self.sent = 0
+
+    def permissions_for(self, _member):
+        return PERMISSIONS
+
+    async def send(self, content=None, **_kwargs):
+        self.sent += 1
+
+    async def create_webhook(self, **_kwargs):
+        return FakeWebhook()
+
+
+class FakeGuild:
+    def __init__(self, channel_count: int):
+        self.id = GUILD_ID
+        self.me = FakeMember('Reminder Bot')
+
+        self.channels = [FakeChannel(self, 'channel-{}'.format(n)) for n in range(channel_count)]
+        self._channels = {channel.id: channel for channel in self.channels}
+
+    def get_channel(self, channel_id: int):
+        return self._channels.get(channel_id)
+
+
+class FakeMessage:
+    def __init__(self, content: str, author: FakeMember, channel: FakeChannel):
+        self.id = next(IDS)
+        self.content = content
+        self.author = author
+        self.channel = channel
+        self.guild = channel.guild
+
+        self.tts = False
+        self.attachments = []
+        self.channel_mentions = []
+        self.created_at = datetime.utcnow()
+
+
+def string_names():
+    with open(os.path.join(ROOT, 'main.py')) as f:
+        source = f.read()
+
+    names = set(re.findall(r'''(?:get_string\(|language\[)'([\w/]+)'[)\]]''', source))
+    names.update(('no_perms_managed', 'no_perms_restricted'))
+
+    from consts import REMIND_STRINGS, NATURAL_STRINGS
+
+    names.update(REMIND_STRINGS.values())
+    names.update(NATURAL_STRINGS.values())
+
+    return names
+
+
+def prepare_database(url: str):
+    # the language and strings tables are read while the models import, so fill them first
+    engine = create_engine(url)
+
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE languages (id INTEGER PRIMARY KEY, name VARCHAR(20) NOT NULL UNIQUE, '
+                          'code VARCHAR(2) NOT NULL UNIQUE)'))
+        conn.execute(text('CREATE TABLE strings (id INTEGER PRIMARY KEY, name TEXT, language VARCHAR(2), value TEXT)'))
+
+        conn.execute(text("INSERT INTO languages (name, code) VALUES ('English', 'EN')"))
+
+        for name in sorted(string_names()):
+            conn.execute(text("INSERT INTO strings (name, language, value) VALUES (:name, 'EN', :value)"),
+                         name=name, value=STRING_VALUES.get(name, name))
+
+    engine.dispose()
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(client, guild: FakeGuild, members, count: int, seed: int, query_counter):
+    async def send(content: str, author: FakeMember, channel: FakeChannel):
+        await client.on_message(FakeMessage(content, author, channel))
+
+    # every member says something first so user rows exist, then each channel gets a backlog of reminders
+    for member, channel in zip(members, itertools.cycle(guild.channels)):
+        await send('$help', member, channel)
+
+    for n, channel in itertools.product(range(seed), guild.channels):
+        await send('$remind {}h seeded reminder {}'.format(n + 1, n), members[n % len(members)], channel)
+
+    print('{:<12} {:>9} {:>9} {:>9} {:>9}'.format('scenario', 'msg/s', 'p50 ms', 'p99 ms', 'queries'))
+
+    # multi-target reminders go to the first few channels of the guild
+    targets = ' '.join(channel.mention for channel in guild.channels[:3])
+
+    for name, content in SCENARIOS:
+        content = content.format(channels=targets)
+        senders = zip(itertools.cycle(members), itertools.cycle(guild.channels))
+        latencies = []
+        queries = query_counter[0]
+
+        start = perf_counter()
+
+        for _, (member, channel) in zip(range(count), senders):
+            sent = perf_counter()
+            await send(content, member, channel)
+            latencies.append(perf_counter() - sent)
+
+        elapsed = perf_counter() - start
+
+        print('{:<12} {:>9.0f} {:>9.2f} {:>9.2f} {:>9.1f}'.format(
+            name,
+            count / elapsed,
+            percentile(latencies, 0.5) * 1000,
+            percentile(latencies, 0.99) * 1000,
+            (query_counter[0] - queries) / count))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    directory = tempfile.mkdtemp(prefix='reminder-bench-')
+    url = 'sqlite:///{}?check_same_thread=false'.format(os.path.join(directory, 'bench.db'))
+
+    with open(os.path.join(directory, 'config.ini'), 'w') as f:
+        f.write('[DEFAULT]\ntoken = benchmark\nlocal_timezone = UTC\nlocal_language = EN\n\n'
+                '[SHARDS]\n\n[MYSQL]\nurl = {}\n'.format(url))
+
+    # models and main both read config.ini from the working directory
+    os.chdir(directory)
+
+    try:
+        prepare_database(url)
+
+        import main as bot
+        from dispatch import CommandMatcher
+        from models import engine
+        from stats import COMMAND_STATS
+
+        query_counter = [0]
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _count_query(*_):
+            query_counter[0] += 1
+
+        client = bot.client
+        client.matcher = CommandMatcher(client.command_names, BOT_ID)
+
+        # del waits for the member to pick reminders; answer straight away without picking any, so the listing
+        # stays the same size from one run to the next
+        async def wait_for(_event, check=None, timeout=None):
+            return FakeMessage('cancel', None, guild.channels[0])
+
+        client.wait_for = wait_for
+
+        guild = FakeGuild(channel_count=10)
+        members = [FakeMember('member{}'.format(n)) for n in range(50)]
+
+        client.loop.run_until_complete(run(client, guild, members, count, seed, query_counter))
+
+        print()
+        print(COMMAND_STATS.summary())
+
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
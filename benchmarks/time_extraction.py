@@ -0,0 +1,170 @@
+"""
+Compare TimeExtractor with the character-by-character implementation it replaced.
+
+    python benchmarks/time_extraction.py [corpus size]
+"""
+import os
+import random
+import sys
+import timeit
+from datetime import datetime
+from time import time as unix_time
+
+import pytz
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from time_extractor import TimeExtractor, InvalidTime  # noqa: E402
+
+TIMEZONE = 'Europe/London'
+SHORT_FORMS = ['10m', '90', '2h', '-5m', '1h30m', '25/12', '12:30']
+
+
+class LegacyTimeExtractor(TimeExtractor):
+    # the previous displacement parsing. explicit times are parsed the same way as before
+    def _process_displacement(self) -> int:
+        current_buffer = '0'
+        seconds = 0
+        minutes = 0
+        hours = 0
+        days = 0
+
+        for char in self.time_string:
+
+            if char == 's':
+                seconds = int(current_buffer)
+                current_buffer = '0'
+
+            elif char == 'm':
+                minutes = int(current_buffer)
+                current_buffer = '0'
+
+            elif char == 'h':
+                hours = int(current_buffer)
+                current_buffer = '0'
+
+            elif char == 'd':
+                days = int(current_buffer)
+                current_buffer = '0'
+
+            else:
+                try:
+                    int(char)
+                    current_buffer += char
+                except ValueError:
+                    raise InvalidTime()
+
+        full = seconds + (minutes * 60) + (hours * 3600) + (days * 86400) + int(current_buffer)
+
+        if self.inverted:
+            full = -full
+
+        return full
+
+
+def displacement(rng: random.Random) -> str:
+    if rng.random() < 0.7:
+        # the usual shape: a few unit pairs in order
+        units = rng.sample('dhms', rng.randint(1, 3))
+        string = ''.join('{}{}'.format(rng.randint(0, 90), unit) for unit in 'dhms' if unit in units)
+
+    else:
+        string = ''.join(rng.choice('0123456789smhd') for _ in range(rng.randint(0, 8)))
+
+        if rng.random() < 0.3:
+            position = rng.randint(0, len(string))
+            string = string[:position] + rng.choice('x ٣+_') + string[position:]
+
+    return ('-' if rng.random() < 0.1 else '') + string
+
+
+def explicit(rng: random.Random) -> str:
+    clumps = []
+
+    for _ in range(rng.choice((1, 1, 2, 2, 3))):
+        clumps.append(rng.choice((
+            lambda: '{}/{}'.format(rng.randint(1, 31), rng.randint(1, 12)),
+            lambda: '{}/{}/{}'.format(rng.randint(1, 31), rng.randint(1, 13), rng.randint(2020, 2030)),
+            lambda: '{}:{:02}'.format(rng.randint(0, 24), rng.randint(0, 60)),
+            lambda: '{}:{:02}:{:02}'.format(rng.randint(0, 23), rng.randint(0, 59), rng.randint(0, 60)),
+            lambda: str(rng.randint(1, 32)),
+            lambda: rng.choice(('', '1:2:3:4', '1/2/3/4', 'a:b', ' 5:30')),
+        ))())
+
+    return '-'.join(clumps)
+
+
+def build_corpus(size: int, seed: int = 0):
+    rng = random.Random(seed)
+
+    return [displacement(rng) if rng.random() < 0.6 else explicit(rng) for _ in range(size)]
+
+
+def outcome(extractor: TimeExtractor, date: datetime):
+    try:
+        if extractor.process_type.name == 'EXPLICIT':
+            return extractor._process_explicit(date)
+
+        return extractor._process_displacement()
+
+    except (InvalidTime, ValueError):
+        return InvalidTime
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    corpus = build_corpus(size)
+
+    zone = pytz.timezone(TIMEZONE)
+    dates = [datetime(2026, month, day, 13, 45, 10, tzinfo=pytz.utc).astimezone(zone)
+             for month, day in ((1, 31), (2, 28), (3, 29), (6, 30), (10, 18), (12, 31))]
+
+    for date in dates:
+        for string in corpus:
+            old = outcome(LegacyTimeExtractor(string, TIMEZONE), date)
+            new = outcome(TimeExtractor(string, TIMEZONE), date)
+            assert old == new, (string, date, old, new)
+
+    valid = sum(outcome(TimeExtractor(string, TIMEZONE), dates[0]) is not InvalidTime for string in corpus)
+    print('{} strings ({} valid) agree on {} dates'.format(size, valid, len(dates)))
+
+    def run(strings):
+        for string in strings:
+            try:
+                TimeExtractor(string, TIMEZONE).extract_exact()
+
+            except InvalidTime:
+                pass
+
+    def run_legacy(strings):
+        # the legacy code also looked the timezone up on every call
+        for string in strings:
+            try:
+                extractor = LegacyTimeExtractor(string, TIMEZONE)
+
+                if extractor.process_type.name == 'EXPLICIT':
+                    extractor._process_explicit(datetime.now(pytz.timezone(TIMEZONE)))
+
+                else:
+                    unix_time() + extractor._process_displacement()
+
+            except (InvalidTime, ValueError):
+                pass
+
+    for name, method in (('legacy', lambda: run_legacy(corpus)),
+                         ('TimeExtractor', lambda: run(corpus)),
+                         ('extract_many', lambda: TimeExtractor.extract_many(corpus, TIMEZONE))):
+        best = min(timeit.repeat(method, number=1, repeat=5))
+        print('{:<16} {:>8.3f}s  {:>8.0f} ns/string'.format(name, best, best / size * 1e9))
+
+    # what people mostly type, each on its own
+    print('\n{:<16} {:>8} {:>14}'.format('string', 'legacy ns', 'TimeExtractor'))
+
+    for string in SHORT_FORMS:
+        legacy, new = (min(timeit.repeat(lambda: method([string] * 1000), number=1, repeat=20)) / 1000 * 1e9
+                       for method in (run_legacy, run))
+        print('{:<16} {:>8.0f} {:>14.0f}'.format(string, legacy, new))
+
+
+if __name__ == '__main__':
+    main()
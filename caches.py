@@ -0,0 +1,357 @@
+import math
+import threading
+import typing
+from collections import OrderedDict
+from datetime import datetime
+from functools import partial
+from time import monotonic
+
+from sqlalchemy.exc import IntegrityError
+
+from consts import GUILD_CACHE_SIZE, USER_CACHE_SIZE, MEMBERSHIP_CACHE_SIZE, RESTRICTION_CACHE_SIZE, \
+    CHANNEL_CACHE_SIZE, TIMER_CACHE_SIZE, USER_CACHE_TTL, GUILD_CACHE_TTL, CHANNEL_CACHE_TTL
+from models import Guild, User, Channel, CommandRestriction, Role, Timer, guild_users, session, after_commit
+
+
+class LRUCache:
+    def __init__(self, max_size: int, ttl: float = math.inf):
+        self.max_size: int = max_size
+        # seconds an entry is served for before it's loaded again
+        self.ttl: float = ttl
+
+        # filled from the database threads and read from the event loop. values are kept with the time they expire
+        self._lock: threading.Lock = threading.Lock()
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key):
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+
+            except KeyError:
+                return None
+
+            else:
+                if expires < monotonic():
+                    del self._data[key]
+                    return None
+
+                self._data.move_to_end(key)
+                return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (value, monotonic() + self.ttl)
+            self._data.move_to_end(key)
+
+            if len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            return self._data.pop(key, (None, None))[0]
+
+    def update(self, key, **changes):
+        # write-through for settings changed by commands; absent keys load fresh on next fetch
+        with self._lock:
+            if (entry := self._data.get(key)) is not None:
+                self._data[key] = (entry[0]._replace(**changes), entry[1])
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class GuildSettings(typing.NamedTuple):
+    id: int
+    prefix: str
+    timezone: str
+
+
+class GuildCache(LRUCache):
+    def fetch(self, guild_id: int) -> GuildSettings:
+        settings: typing.Optional[GuildSettings] = self.get(guild_id)
+
+        if settings is None:
+            guild = session.query(Guild).filter(Guild.guild == guild_id).first()
+
+            if guild is None:
+                guild = Guild(guild=guild_id)
+
+                session.add(guild)
+                session.flush()
+
+            settings = GuildSettings(guild.id, guild.prefix, guild.timezone)
+            # the row may be this command's own, so it's only cached once it's committed
+            after_commit(partial(self.put, guild_id, settings))
+
+        return settings
+
+
+class UserSettings(typing.NamedTuple):
+    id: int
+    dm_channel: int
+    language: str
+    timezone: typing.Optional[str]
+    allowed_dm: bool
+
+
+class UserCache(LRUCache):
+    def fetch(self, user_id: int) -> typing.Optional[UserSettings]:
+        settings: typing.Optional[UserSettings] = self.get(user_id)
+
+        if settings is None:
+            user = session.query(User).filter(User.user == user_id).first()
+
+            if user is not None:
+                settings = self.add(user)
+
+        return settings
+
+    def fetch_many(self, user_ids: typing.Iterable[int]) -> typing.Dict[int, UserSettings]:
+        found: typing.Dict[int, UserSettings] = {}
+        missing: typing.List[int] = []
+
+        for user_id in user_ids:
+            if (settings := self.get(user_id)) is not None:
+                found[user_id] = settings
+
+            else:
+                missing.append(user_id)
+
+        if missing:
+            for user in session.query(User).filter(User.user.in_(missing)):
+                found[user.user] = self.add(user)
+
+        return found
+
+    def create(self, user_id: int, name: str, dm_channel_id: int) -> UserSettings:
+        return self.create_many([(user_id, name, dm_channel_id)])[user_id]
+
+    def create_many(self, members: typing.Sequence[typing.Tuple[int, str, int]]) -> typing.Dict[int, UserSettings]:
+        # members are (user id, name, DM channel id)
+        dm_channels: typing.Dict[int, Channel] = {
+            c.channel: c for c in session.query(Channel).filter(Channel.channel.in_([m[2] for m in members]))
+        }
+
+        for _, _, dm_channel_id in members:
+            if dm_channel_id not in dm_channels:
+                dm_channels[dm_channel_id] = Channel(channel=dm_channel_id)
+                session.add(dm_channels[dm_channel_id])
+
+        session.flush()
+
+        users = [User(user=user_id, dm_channel=dm_channels[dm_channel_id].id, name=name)
+                 for user_id, name, dm_channel_id in members]
+        session.add_all(users)
+        session.flush()
+
+        return {user.user: self.add(user) for user in users}
+
+    def add(self, user: User) -> UserSettings:
+        settings = self._settings(user)
+        # the row may be this command's own, so it's only cached once it's committed
+        after_commit(partial(self.put, user.user, settings))
+
+        return settings
+
+    @staticmethod
+    def _settings(user: User) -> UserSettings:
+        return UserSettings(user.id, user.dm_channel, user.language, user.timezone, user.allowed_dm)
+
+
+class ChannelSettings(typing.NamedTuple):
+    id: int
+    guild_id: typing.Optional[int]
+    blacklisted: bool
+    nudge: int
+    paused: bool
+    has_webhook: bool
+
+
+class ChannelCache(LRUCache):
+    def fetch(self, finding_channel, guild_id: typing.Optional[int] = None) -> ChannelSettings:
+        settings: typing.Optional[ChannelSettings] = self.get(finding_channel.id)
+
+        if settings is None:
+            channel, new = Channel.get_or_create(finding_channel)
+
+            if guild_id is not None and channel.guild_id is None:
+                channel.guild_id = guild_id
+
+            settings = self._settings(channel)
+
+            # a new row isn't committed yet, so it's only cached once it's seen again
+            if not new:
+                self.put(finding_channel.id, settings)
+
+        return settings
+
+    def fetch_many(self, finding_channels, guild_id: typing.Optional[int] = None) -> typing.Dict[int, ChannelSettings]:
+        found: typing.Dict[int, ChannelSettings] = {}
+        missing: typing.Dict[int, typing.Any] = {}
+
+        for finding_channel in finding_channels:
+            if (settings := self.get(finding_channel.id)) is not None:
+                found[finding_channel.id] = settings
+
+            else:
+                missing[finding_channel.id] = finding_channel
+
+        if missing:
+            rows: typing.Dict[int, Channel] = {
+                c.channel: c for c in session.query(Channel).filter(Channel.channel.in_(missing))
+            }
+            new: typing.Set[int] = set()
+
+            for channel_id, finding_channel in missing.items():
+                channel = rows.get(channel_id)
+
+                if channel is None:
+                    if guild_id is None:
+                        guild_id = session.query(Guild.id).filter(Guild.guild == finding_channel.guild.id).scalar()
+
+                    rows[channel_id] = channel = Channel(channel=channel_id, name=finding_channel.name,
+                                                         guild_id=guild_id)
+                    session.add(channel)
+                    new.add(channel_id)
+
+                else:
+                    if channel.name != finding_channel.name:
+                        channel.name = finding_channel.name
+
+                    if guild_id is not None and channel.guild_id is None:
+                        channel.guild_id = guild_id
+
+            if new:
+                session.flush()
+
+            for channel_id, channel in rows.items():
+                found[channel_id] = settings = self._settings(channel)
+
+                # a new row isn't committed yet, so it's only cached once it's seen again
+                if channel_id not in new:
+                    self.put(channel_id, settings)
+
+        return found
+
+    @staticmethod
+    def _settings(channel: Channel) -> ChannelSettings:
+        return ChannelSettings(channel.id, channel.guild_id, channel.blacklisted, channel.nudge, channel.paused,
+                               (channel.webhook_token or channel.webhook_id) is not None)
+
+
+class MembershipCache:
+    def __init__(self, max_size: int):
+        self.max_size: int = max_size
+
+        # (guild, user) row ids packed into one int each; both columns are unsigned 32 bit
+        self._members: typing.Set[int] = set()
+
+    def contains(self, guild_id: int, user_id: int) -> bool:
+        return ((guild_id << 32) | user_id) in self._members
+
+    def ensure(self, guild_id: int, user_id: int):
+        key = (guild_id << 32) | user_id
+
+        if key not in self._members:
+            exists = session.query(guild_users) \
+                .filter(guild_users.c.guild == guild_id) \
+                .filter(guild_users.c.user == user_id) \
+                .first()
+
+            if exists is None:
+                session.execute(guild_users.insert().values(guild=guild_id, user=user_id))
+
+                # until the row is committed, a rollback could still take it away
+                after_commit(partial(self._add, key))
+
+            else:
+                self._add(key)
+
+    def _add(self, key: int):
+        if len(self._members) >= self.max_size:
+            self._members.clear()
+
+        self._members.add(key)
+
+
+class RestrictionCache(LRUCache):
+    def fetch(self, guild_id: int) -> typing.Dict[str, typing.FrozenSet[int]]:
+        restrictions: typing.Optional[typing.Dict[str, typing.FrozenSet[int]]] = self.get(guild_id)
+
+        if restrictions is None:
+            allowed: typing.Dict[str, typing.Set[int]] = {}
+
+            query = session.query(CommandRestriction.command, Role.role) \
+                .join(CommandRestriction.role) \
+                .filter(CommandRestriction.guild_id == guild_id)
+
+            for command, role in query:
+                allowed.setdefault(command, set()).add(role)
+
+            restrictions = {command: frozenset(roles) for command, roles in allowed.items()}
+            self.put(guild_id, restrictions)
+
+        return restrictions
+
+    def allowed_roles(self, guild_id: int, command: str) -> typing.FrozenSet[int]:
+        return self.fetch(guild_id).get(command, frozenset())
+
+
+class TimerSettings(typing.NamedTuple):
+    name: str
+    start_time: datetime
+
+
+class TimerCache(LRUCache):
+    def fetch(self, owner: int) -> typing.Tuple[TimerSettings, ...]:
+        timers: typing.Optional[typing.Tuple[TimerSettings, ...]] = self.get(owner)
+
+        if timers is None:
+            query = session.query(Timer.name, Timer.start_time).filter(Timer.owner == owner).order_by(Timer.id)
+
+            timers = tuple(TimerSettings(name, start_time) for name, start_time in query)
+            self.put(owner, timers)
+
+        return timers
+
+    def start(self, owner: int, name: str) -> bool:
+        # False if the owner already has a timer by that name. the unique (owner, name) key decides, so two timers
+        # started at once can't both take it
+        try:
+            with session.begin_nested():
+                session.execute(Timer.__table__.insert().values(
+                    owner=owner, name=name, start_time=datetime.now().replace(microsecond=0)))
+
+        except IntegrityError:
+            return False
+
+        after_commit(partial(self.pop, owner))
+
+        return True
+
+    def delete(self, owner: int, name: str) -> bool:
+        deleted = session.query(Timer) \
+            .filter(Timer.owner == owner) \
+            .filter(Timer.name == name) \
+            .delete(synchronize_session=False)
+
+        if deleted:
+            after_commit(partial(self.pop, owner))
+
+        return deleted > 0
+
+
+GUILD_CACHE: GuildCache = GuildCache(GUILD_CACHE_SIZE, GUILD_CACHE_TTL)
+USER_CACHE: UserCache = UserCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+CHANNEL_CACHE: ChannelCache = ChannelCache(CHANNEL_CACHE_SIZE, CHANNEL_CACHE_TTL)
+MEMBERSHIP_CACHE: MembershipCache = MembershipCache(MEMBERSHIP_CACHE_SIZE)
+RESTRICTION_CACHE: RestrictionCache = RestrictionCache(RESTRICTION_CACHE_SIZE)
+TIMER_CACHE: TimerCache = TimerCache(TIMER_CACHE_SIZE)
@@ -19,6 +19,17 @@ class Config(IniDeserializer):
     local_language = Field(default='EN')
 
     ignore_bots = BooleanField(default=False)
+    # reminders with the same text share one message row. leave off while the dashboard edits message rows in place
+    share_messages = BooleanField(default=False)
+
+    database_threads = IntegerField(default=4)
+    # commands hold a connection from their first query until they complete, waits for replies included
+    database_connections = IntegerField(default=32)
+
+    # processes for dateparser; 0 parses in the thread pool instead
+    dateparser_processes = IntegerField(default=0)
+    dateparser_queue = IntegerField(default=64)
+    dateparser_timeout = IntegerField(default=5)
 
     DEFAULT = Section(
         patreon_role,
@@ -29,6 +40,12 @@ class Config(IniDeserializer):
         local_timezone,
         local_language,
         ignore_bots,
+        share_messages,
+        database_threads,
+        database_connections,
+        dateparser_processes,
+        dateparser_queue,
+        dateparser_timeout,
     )
 
     SHARDS = Section(
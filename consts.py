@@ -9,6 +9,31 @@ DAY_LENGTH: int = 86400
 MAX_TIME_DAYS: int = MAX_TIME // DAY_LENGTH
 MIN_INTERVAL: int = 800
 
+GUILD_CACHE_SIZE: int = 25000
+USER_CACHE_SIZE: int = 100000
+CHANNEL_CACHE_SIZE: int = 100000
+MEMBERSHIP_CACHE_SIZE: int = 1000000
+RESTRICTION_CACHE_SIZE: int = 25000
+TIMER_CACHE_SIZE: int = 25000
+NATURAL_CACHE_SIZE: int = 10000
+
+# settings can change in another shard's process or on the dashboard, so they're read again after this long
+USER_CACHE_TTL: int = 300
+GUILD_CACHE_TTL: int = 300
+CHANNEL_CACHE_TTL: int = 300
+
+# timers one guild or DM can run at once; an embed holds no more fields than this
+MAX_TIMERS: int = 25
+
+# reminders shown at once by look and del
+LISTING_PAGE_SIZE: int = 25
+# reminders shown before a filtered del asks for confirmation, and deleted by each of its statements
+DELETE_PREVIEW_SIZE: int = 10
+DELETE_CHUNK_SIZE: int = 1000
+
+# longest a parsed relative phrase (e.g 'in 2 hours') is reused for, in seconds
+NATURAL_RELATIVE_TTL: int = 3600
+
 REMIND_STRINGS: dict = {
     CreateReminderResponse.OK: 'remind/success',
     CreateReminderResponse.LONG_TIME: 'remind/long_time',
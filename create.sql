@@ -91,6 +91,8 @@ CREATE TABLE reminders.messages (
     id INT UNSIGNED AUTO_INCREMENT UNIQUE NOT NULL,
 
     content VARCHAR(2048) NOT NULL DEFAULT '',
+    content_hash BINARY(32) UNIQUE, # sha256 of content on plain text rows, which reminders share. never edited in place
+    interned_at TIMESTAMP NULL, # last time a reminder took up the shared row
     tts BOOL NOT NULL DEFAULT 0,
     embed_id INT UNSIGNED,
 
@@ -123,14 +125,16 @@ CREATE TABLE reminders.reminders (
     set_by INT UNSIGNED,
 
     PRIMARY KEY (id),
+    INDEX channel_time (channel_id, `time`, id), # look and del page through reminders in this order
     FOREIGN KEY (message_id) REFERENCES reminders.messages(id) ON DELETE RESTRICT,
     FOREIGN KEY (channel_id) REFERENCES reminders.channels(id) ON DELETE CASCADE,
     FOREIGN KEY (set_by) REFERENCES reminders.users(id) ON DELETE SET NULL
 );
 
+# shared rows are left to message_sweep, since a reminder may be taking one up again while the last is deleted
 CREATE TRIGGER message_cleanup AFTER DELETE ON reminders.reminders
 FOR EACH ROW
-    DELETE FROM reminders.messages WHERE id = OLD.message_id;
+    DELETE FROM reminders.messages WHERE id = OLD.message_id AND content_hash IS NULL;
 
 CREATE TRIGGER embed_cleanup AFTER DELETE ON reminders.messages
 FOR EACH ROW
@@ -142,8 +146,12 @@ CREATE TABLE reminders.todos (
     guild_id INT UNSIGNED,
     channel_id INT UNSIGNED,
     value VARCHAR(2000) NOT NULL,
+    position INT UNSIGNED NOT NULL DEFAULT 0, # 1-based place in the user, server or channel list
 
     PRIMARY KEY (id),
+    INDEX user_position (user_id, guild_id, channel_id, position),
+    INDEX guild_position (guild_id, channel_id, position),
+    INDEX channel_position (channel_id, position),
     FOREIGN KEY (user_id) REFERENCES reminders.users(id) ON DELETE SET NULL,
     FOREIGN KEY (guild_id) REFERENCES reminders.guilds(id) ON DELETE CASCADE,
     FOREIGN KEY (channel_id) REFERENCES reminders.channels(id) ON DELETE SET NULL
@@ -168,7 +176,8 @@ CREATE TABLE reminders.timers (
     name VARCHAR(32) NOT NULL,
     owner BIGINT UNSIGNED NOT NULL,
 
-    PRIMARY KEY (id)
+    PRIMARY KEY (id),
+    UNIQUE KEY owner_name (owner, name)
 );
 
 CREATE TABLE reminders.events (
@@ -217,6 +226,11 @@ ON SCHEDULE AT CURRENT_TIMESTAMP + INTERVAL 1 DAY
 ON COMPLETION PRESERVE
 DO DELETE FROM reminders.events WHERE `time` < DATE_SUB(NOW(), INTERVAL 5 DAY);
 
+CREATE EVENT reminders.message_sweep
+ON SCHEDULE EVERY 1 HOUR
+DO DELETE m FROM reminders.messages m LEFT JOIN reminders.reminders r ON r.message_id = m.id
+    WHERE m.content_hash IS NOT NULL AND r.id IS NULL AND m.interned_at < DATE_SUB(NOW(), INTERVAL 1 HOUR);
+
 CREATE TABLE reminders.languages (
     id SMALLINT UNSIGNED AUTO_INCREMENT UNIQUE NOT NULL,
     name VARCHAR(20) NOT NULL,
@@ -0,0 +1,92 @@
+import typing
+
+
+class CommandMatch(typing.NamedTuple):
+    prefix: typing.Optional[str]
+    cmd: str
+    args: typing.Optional[str]
+
+
+class CommandMatcher:
+    """
+    Matches messages the same way as the pattern
+
+        (?:(?:<@ID>\\s*)|(?:<@!ID>\\s*)|(?P<prefix>\\S{1,5}?))(?P<cmd>COMMANDS)(?:$|\\s+(?P<args>.*))
+
+    under MULTILINE | DOTALL | IGNORECASE, using hash lookups over the command names instead of a regex alternation
+    """
+
+    def __init__(self, command_names: typing.Iterable[str], user_id: int, max_prefix_length: int = 5):
+        self.commands: typing.FrozenSet[str] = frozenset(name.lower() for name in command_names)
+
+        # the alternation is sorted longest first, so lookups must try lengths in the same order
+        self.lengths: typing.Dict[str, typing.List[int]] = {}
+        for name in self.commands:
+            if name:
+                self.lengths.setdefault(name[0], []).append(len(name))
+
+        for lengths in self.lengths.values():
+            lengths.sort(reverse=True)
+
+        self.allows_empty: bool = '' in self.commands
+
+        self.mentions: typing.Tuple[str, str] = ('<@{}>'.format(user_id), '<@!{}>'.format(user_id))
+        self.max_prefix_length: int = max_prefix_length
+
+    def match(self, content: str, prefix: typing.Optional[str] = None) -> typing.Optional[CommandMatch]:
+        # with a known guild prefix, anything not starting with it or a mention can never be accepted
+        if prefix is not None and not content.startswith(prefix) and not content.startswith('<@'):
+            return None
+
+        for mention in self.mentions:
+            if content.startswith(mention):
+                start = len(mention)
+                end = start
+
+                while end < len(content) and content[end].isspace():
+                    end += 1
+
+                # \s* is greedy, so give back whitespace one character at a time
+                for position in range(end, start - 1, -1):
+                    found = self._match_command(content, position)
+
+                    if found is not None:
+                        return CommandMatch(None, *found)
+
+        # \S{1,5}? is lazy, so the shortest workable prefix wins
+        for length in range(1, self.max_prefix_length + 1):
+            if length > len(content) or content[length - 1].isspace():
+                break
+
+            found = self._match_command(content, length)
+
+            if found is not None:
+                return CommandMatch(content[:length], *found)
+
+        return None
+
+    def _match_command(self, content: str, start: int) -> typing.Optional[typing.Tuple[str, typing.Optional[str]]]:
+        lengths = () if start >= len(content) else self.lengths.get(content[start].lower(), ())
+
+        for length in lengths:
+            end = start + length
+
+            if end <= len(content) and (cmd := content[start:end].lower()) in self.commands:
+                if (found := self._match_args(content, end)) is not None:
+                    return cmd, found[0]
+
+        if self.allows_empty and (found := self._match_args(content, start)) is not None:
+            return '', found[0]
+
+        return None
+
+    @staticmethod
+    def _match_args(content: str, end: int) -> typing.Optional[typing.Tuple[typing.Optional[str]]]:
+        # $ also matches before a newline under MULTILINE, leaving no args
+        if end == len(content) or content[end] == '\n':
+            return None,
+
+        elif content[end].isspace():
+            return content[end:].lstrip(),
+
+        return None
@@ -1,6 +1,9 @@
 import asyncio
 import concurrent.futures
+import contextvars
+import io
 import itertools
+import multiprocessing
 import re
 from datetime import datetime, timedelta
 from functools import partial
@@ -9,12 +12,19 @@ from time import time as unix_time
 import logging
 
 import aiohttp
-import dateparser
-import pytz
+from sqlalchemy import func
 
 from config import Config
 from consts import *
-from models import Reminder, Todo, Timer, Message, Channel, Event, CommandAlias
+from models import Reminder, Todo, Message, Embed, Channel, Event, CommandAlias, CommandRestriction, Role, \
+    STRING_CATALOG, ReminderPages, reminder_content, engine, run_transaction, unit_of_work, after_commit
+from caches import GUILD_CACHE, USER_CACHE, CHANNEL_CACHE, MEMBERSHIP_CACHE, RESTRICTION_CACHE, TIMER_CACHE, \
+    GuildSettings, UserSettings, ChannelSettings
+from dispatch import CommandMatcher
+from paginator import paginate, EMBED_LIMIT
+from natural_parser import NATURAL_TIMES, ParserBusy, fast_parse, interval_status, parse_interval, probe, warm_up
+from timezones import TIMEZONES
+from stats import COMMAND_STATS
 from passers import *
 from time_extractor import TimeExtractor, InvalidTime
 from enums import TodoScope
@@ -72,45 +82,183 @@ class BotClient(discord.AutoShardedClient):
             'offset': Command('offset', self.offset_reminders, True, PermissionLevels.RESTRICTED),
             'nudge': Command('nudge', self.nudge_channel, True, PermissionLevels.RESTRICTED),
             'pause': Command('pause', self.pause_channel, False, PermissionLevels.RESTRICTED),
+
+            'stats': Command('stats', self.stats, blacklists=False),
+            'reload': Command('reload', self.reload_strings, blacklists=False),
         }
 
-        self.match_string = None
+        self.matcher: typing.Optional[CommandMatcher] = None
 
         self.command_names = set(self.commands.keys())
-        self.joined_names = '|'.join(sorted(self.commands.keys(), key=len, reverse=True))
 
         # used in restrict command for filtration
         self.max_command_length = max(len(x) for x in self.command_names)
 
         self.executor: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor()
+        # queries run here so a slow one never holds up the gateway. each thread has its own session
+        self.database_executor: concurrent.futures.ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=config.database_threads, thread_name_prefix='database')
         self.c_session: typing.Optional[aiohttp.ClientSession] = None
+        self.owner_id: typing.Optional[int] = None
+
+        # dateparser holds the GIL for its whole parse, so it can be given processes of its own
+        self.parse_executor: typing.Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.parse_slots: asyncio.Semaphore = asyncio.Semaphore(config.dateparser_queue)
+
+        if config.dateparser_processes > 0:
+            # forked now, while this is the only thread, so no child inherits a lock held by another thread
+            self.parse_executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=config.dateparser_processes, mp_context=multiprocessing.get_context('fork'),
+                initializer=warm_up)
+            # submitting forks the processes, so do it before any other thread starts. each warms itself up
+            self.parse_executor.submit(int)
 
         super(BotClient, self).__init__(*args, **kwargs)
 
+        # every Discord API call goes through here, so count them against the running command
+        request = self.http.request
+
+        async def counted_request(*a, **k):
+            COMMAND_STATS.count_api_call()
+            return await request(*a, **k)
+
+        self.http.request = counted_request
+
     async def do_blocking(self, method):
         # perform a long running process within a threadpool
         a, _ = await asyncio.wait([self.loop.run_in_executor(self.executor, method)])
         return [x.result() for x in a][0]
 
+    async def do_database(self, method):
+        # perform database work on a database thread. the context goes along so the work uses the calling command's
+        # session, which is safe since the command is suspended until the work completes. commands keep every query
+        # and commit in here; the event loop only builds queries, and reads what the caches and Preferences already hold
+        context = contextvars.copy_context()
+
+        return await self.loop.run_in_executor(
+            self.database_executor, partial(context.run, run_transaction, method))
+
+    async def commit(self):
+        # commit the command's work so far on a database thread. on_message ends with this, and commands call it
+        # before waiting on a person so nothing they've touched stays locked meanwhile
+        await self.do_database(session.commit)
+
+    async def turn_page(self, message, page: int, more: bool) \
+            -> typing.Tuple[typing.Optional[int], typing.Optional[discord.Message]]:
+        # offer the pages either side of a listing's current one. gives the page asked for, or else whatever the
+        # author replied with instead
+        if page > 1 or more:
+            await message.channel.send(
+                '{} **{}** {}'.format('`<`' if page > 1 else '', page, '`>`' if more else '').strip())
+
+        # don't hold this command's locks while waiting on a person
+        await self.commit()
+
+        try:
+            with COMMAND_STATS.waiting():
+                reply = await self.wait_for('message',
+                                            check=lambda m: m.author == message.author and m.channel == message.channel,
+                                            timeout=30)
+
+        except asyncio.exceptions.TimeoutError:
+            return None, None
+
+        if reply.content.strip() == '>' and more:
+            return page + 1, None
+
+        elif reply.content.strip() == '<' and page > 1:
+            return page - 1, None
+
+        else:
+            return None, reply
+
+    async def parse_time(self, phrase: str, timezone: typing.Optional[str], base: datetime,
+                         settings: typing.Optional[dict] = None) -> typing.Optional[datetime]:
+        parsed = NATURAL_TIMES.get(phrase, timezone)
+
+        if parsed is None:
+            # once every slot is taken, turn the phrase away rather than queue a parse that would only time out
+            if self.parse_slots.locked():
+                raise ParserBusy()
+
+            await self.parse_slots.acquire()
+
+            task = asyncio.ensure_future(self._probe(phrase, timezone, base, settings))
+            # the slot is held until the parse is done, even after nobody is waiting for it
+            task.add_done_callback(lambda _: self.parse_slots.release())
+
+            try:
+                result = await asyncio.wait_for(asyncio.shield(task), timeout=config.dateparser_timeout)
+
+            except asyncio.TimeoutError:
+                logging.warning('Gave up parsing {!r} after {}s'.format(phrase, config.dateparser_timeout))
+
+                # the parse carries on regardless, so keep its answer for the next person to try the phrase
+                def _store(t):
+                    if not t.cancelled() and t.exception() is None:
+                        NATURAL_TIMES.store(phrase, timezone, base, t.result())
+
+                task.add_done_callback(_store)
+                return None
+
+            parsed = NATURAL_TIMES.store(phrase, timezone, base, result)
+
+        return parsed.at(base)
+
+    async def _probe(self, phrase: str, timezone: typing.Optional[str], base: datetime,
+                     settings: typing.Optional[dict]):
+        if self.parse_executor is not None:
+            try:
+                return await asyncio.wrap_future(self.parse_executor.submit(probe, phrase, timezone, base, settings))
+
+            except concurrent.futures.process.BrokenProcessPool:
+                # a fresh pool would be forked from a threaded process, so carry on in the thread pool instead
+                logging.exception('Parser processes died; parsing in threads from now on')
+                self.parse_executor = None
+
+        return await self.do_blocking(partial(probe, phrase, timezone, base, settings))
+
     @staticmethod
-    async def find_and_create_member(member_id: int, context_guild: typing.Optional[discord.Guild]) \
-            -> typing.Optional[User]:
-        u: User = session.query(User).filter(User.user == member_id).first()
+    async def parser_busy(message):
+        # there's no translation for this yet, so it's only said in English
+        await message.channel.send(embed=discord.Embed(
+            description='Too many reminders are being set right now. Please try again in a moment'))
 
-        if u is None and context_guild is not None:
-            m = await context_guild.fetch_member(member_id)
+    async def find_and_create_members(self, member_ids: typing.Iterable[int],
+                                      context_guild: typing.Optional[discord.Guild]) -> typing.Dict[int, UserSettings]:
+        member_ids = list(dict.fromkeys(member_ids))
 
-            if m is not None:
-                c = Channel(channel=(await m.create_dm()).id)
-                session.add(c)
-                session.flush()
+        users: typing.Dict[int, UserSettings] = {
+            member_id: u for member_id in member_ids if (u := USER_CACHE.get(member_id)) is not None
+        }
 
-                u = User(user=m.id, name='{}'.format(m), dm_channel=c.id)
+        if len(users) < len(member_ids):
+            users.update(await self.do_database(partial(
+                USER_CACHE.fetch_many, [member_id for member_id in member_ids if member_id not in users])))
 
-                session.add(u)
-                session.commit()
+        missing = [member_id for member_id in member_ids if member_id not in users]
 
-        return u
+        if missing and context_guild is not None:
+            members = []
+
+            for m in await asyncio.gather(*(context_guild.fetch_member(member_id) for member_id in missing),
+                                          return_exceptions=True):
+                if isinstance(m, discord.errors.NotFound):
+                    continue
+
+                elif isinstance(m, BaseException):
+                    raise m
+
+                members.append(m)
+
+            if members:
+                dm_channels = await asyncio.gather(*(m.create_dm() for m in members))
+
+                users.update(await self.do_database(partial(
+                    USER_CACHE.create_many,
+                    [(m.id, '{}'.format(m), dm_channel.id) for m, dm_channel in zip(members, dm_channels)])))
+
+        return users
 
     async def is_patron(self, member_id) -> bool:
         if config.patreon_enabled:
@@ -137,7 +285,6 @@ class BotClient(discord.AutoShardedClient):
             return True
 
     async def on_error(self, *a, **k):
-        session.rollback()
         raise
 
     async def on_ready(self):
@@ -146,9 +293,8 @@ class BotClient(discord.AutoShardedClient):
         logging.info(self.user.name)
         logging.info(self.user.id)
 
-        self.match_string = \
-            r'(?:(?:<@ID>\s*)|(?:<@!ID>\s*)|(?P<prefix>\S{1,5}?))(?P<cmd>COMMANDS)(?:$|\s+(?P<args>.*))' \
-                .replace('ID', str(self.user.id)).replace('COMMANDS', self.joined_names)
+        self.matcher = CommandMatcher(self.command_names, self.user.id)
+        self.owner_id = (await self.application_info()).owner.id
 
         self.c_session: aiohttp.client.ClientSession = aiohttp.ClientSession()
 
@@ -174,13 +320,36 @@ class BotClient(discord.AutoShardedClient):
 
         await welcome(guild)
 
-    # noinspection PyMethodMayBeStatic
     async def on_guild_remove(self, guild):
-        session.query(Guild).filter(Guild.guild == guild.id).delete(synchronize_session='fetch')
+        await self.do_database(
+            lambda: session.query(Guild).filter(Guild.guild == guild.id).delete(synchronize_session=False))
+
+        if (guild_settings := GUILD_CACHE.pop(guild.id)) is not None:
+            RESTRICTION_CACHE.pop(guild_settings.id)
+
+        # the channel rows went with the guild's
+        for channel in guild.channels:
+            CHANNEL_CACHE.pop(channel.id)
 
-    # noinspection PyMethodMayBeStatic
     async def on_guild_channel_delete(self, channel):
-        session.query(Channel).filter(Channel.channel == channel.id).delete(synchronize_session='fetch')
+        def _delete():
+            channel_settings = session.query(Channel).filter(Channel.channel == channel.id).first()
+
+            # the channel's todo items become server items. put them on the end of the server's list, in their order
+            if channel_settings is not None and channel_settings.guild_id is not None:
+                last = session.query(func.max(Todo.position)) \
+                    .filter(Todo.guild_id == channel_settings.guild_id, Todo.channel_id.is_(None)) \
+                    .with_for_update().scalar() or 0
+
+                channel_settings.todo_list.update(
+                    {Todo.position: Todo.position + last, Todo.channel_id: None}, synchronize_session=False)
+
+            session.query(Channel).filter(Channel.channel == channel.id).delete(synchronize_session=False)
+
+        # outside a command, the database thread commits this by itself
+        await self.do_database(_delete)
+
+        CHANNEL_CACHE.pop(channel.id)
 
     async def send_guild_counts(self, new_guild):
         if config.dbl_token and self.c_session is not None:
@@ -201,30 +370,34 @@ class BotClient(discord.AutoShardedClient):
             async with self.c_session.post(url, data=dump, headers=head) as resp:
                 logging.debug('returned {0.status} for {1}'.format(resp, dump))
 
-    # noinspection PyBroadException
     async def on_message(self, message):
+        # each message is handled in its own task, so it gets a session no other command can touch
+        with COMMAND_STATS.measure(), unit_of_work():
+            await self.handle_message(message)
+
+            # commit here, leaving the unit of work only the session to release
+            await self.commit()
+
+    # noinspection PyBroadException
+    async def handle_message(self, message):
 
         def _check_self_permissions(_channel):
             p = _channel.permissions_for(message.guild.me)
 
             return p.send_messages and p.embed_links
 
-        async def _get_user(_message):
-            _user = session.query(User).filter(User.user == message.author.id).first()
-            if _user is None:
-                dm_channel_id = (await message.author.create_dm()).id
-
-                c = session.query(Channel).filter(Channel.channel == dm_channel_id).first()
+        async def _get_user(_message) -> UserSettings:
+            _user = USER_CACHE.get(_message.author.id) or \
+                await self.do_database(partial(USER_CACHE.fetch, _message.author.id))
 
-                if c is None:
-                    c = Channel(channel=dm_channel_id)
-                    session.add(c)
-                    session.flush()
+            if _user is None:
+                dm_channel_id = (await _message.author.create_dm()).id
 
-                    _user = User(user=_message.author.id, dm_channel=c.id, name='{}#{}'.format(
-                        _message.author.name, _message.author.discriminator))
-                    session.add(_user)
-                    session.flush()
+                _user = await self.do_database(partial(
+                    USER_CACHE.create,
+                    _message.author.id,
+                    '{}#{}'.format(_message.author.name, _message.author.discriminator),
+                    dm_channel_id))
 
             return _user
 
@@ -232,7 +405,7 @@ class BotClient(discord.AutoShardedClient):
                 message.content is None or \
                 message.tts or \
                 len(message.attachments) > 0 or \
-                self.match_string is None:
+                self.matcher is None:
 
             # either a bot or cannot be a command
             return
@@ -252,6 +425,8 @@ class BotClient(discord.AutoShardedClient):
                     command = self.commands[command_word]
 
                     if command.allowed_dm:
+                        COMMAND_STATS.label(command.name)
+
                         # get user
                         user = await _get_user(message)
 
@@ -262,43 +437,34 @@ class BotClient(discord.AutoShardedClient):
                 await message.channel.send(ENGLISH_STRINGS.get_string('no_perms_webhook'))
 
             else:
-                # command sent in guild. check for prefix & call
-                match = re.match(
-                    self.match_string,
-                    message.content,
-                    re.MULTILINE | re.DOTALL | re.IGNORECASE
-                )
+                # command sent in guild. check for prefix & call. the empty natural command means almost any short
+                # message fits the command structure, so look the prefix up first and reject on it directly
+                guild_settings = GUILD_CACHE.get(message.guild.id) or \
+                    await self.do_database(partial(GUILD_CACHE.fetch, message.guild.id))
+                match = self.matcher.match(message.content, guild_settings.prefix)
 
                 if match is not None:
-                    # matched command structure; now query for guild to compare prefix
-                    guild = session.query(Guild).filter(Guild.guild == message.guild.id).first()
-                    if guild is None:
-                        guild = Guild(guild=message.guild.id)
-
-                        session.add(guild)
-                        session.flush()
-
                     # if none, suggests mention has been provided instead since pattern still matched
-                    if (prefix := match.group('prefix')) in (guild.prefix, None):
+                    if (prefix := match.prefix) in (guild_settings.prefix, None):
                         # prefix matched, might as well get the user now since this is a very small subset of messages
                         user = await _get_user(message)
 
-                        if guild not in user.guilds:
-                            guild.users.append(user)
+                        if not MEMBERSHIP_CACHE.contains(guild_settings.id, user.id):
+                            await self.do_database(partial(MEMBERSHIP_CACHE.ensure, guild_settings.id, user.id))
 
                         # create the nice info manager
-                        info = Preferences(guild, user)
+                        info = Preferences(guild_settings, user)
 
-                        command_word = match.group('cmd').lower()
-                        stripped = match.group('args') or ''
+                        command_word = match.cmd
+                        stripped = match.args or ''
                         command = self.commands[command_word]
 
+                        COMMAND_STATS.label(command.name)
+
                         # some commands dont get blacklisted e.g help, blacklist
                         if command.blacklists:
-                            channel, just_created = Channel.get_or_create(message.channel)
-
-                            if channel.guild_id is None:
-                                channel.guild_id = guild.id
+                            channel = CHANNEL_CACHE.get(message.channel.id) or \
+                                await self.do_database(partial(CHANNEL_CACHE.fetch, message.channel, guild_settings.id))
 
                             if channel.blacklisted:
                                 await message.channel.send(
@@ -306,9 +472,12 @@ class BotClient(discord.AutoShardedClient):
                                 return
 
                         # blacklist checked; now do command permissions
-                        if command.check_permissions(message.author, guild):
+                        if command.permission_level == PermissionLevels.MANAGED and \
+                                guild_settings.id not in RESTRICTION_CACHE:
+                            await self.do_database(partial(RESTRICTION_CACHE.fetch, guild_settings.id))
+
+                        if command.check_permissions(message.author, guild_settings.id):
                             await command.func(message, stripped, info)
-                            session.commit()
 
                         else:
                             await message.channel.send(
@@ -332,6 +501,34 @@ class BotClient(discord.AutoShardedClient):
         Ping: {}ms
         '''.format(round(uptime), round(ping * 1000)))
 
+    async def stats(self, message, stripped, _preferences):
+        if message.author.id != self.owner_id:
+            return
+
+        if stripped == 'prometheus':
+            await message.channel.send(
+                file=discord.File(io.BytesIO(COMMAND_STATS.prometheus().encode()), filename='metrics.txt'))
+
+        else:
+            summary = '{}\n\nstrings: {} hits, {} misses\nnatural times: {} hits, {} misses ({:.0%})'.format(
+                COMMAND_STATS.summary(), STRING_CATALOG.hits, STRING_CATALOG.misses,
+                NATURAL_TIMES.hits, NATURAL_TIMES.misses, NATURAL_TIMES.hit_ratio())
+
+            if len(summary) > 1990:
+                await message.channel.send(file=discord.File(io.BytesIO(summary.encode()), filename='stats.txt'))
+
+            else:
+                await message.channel.send('```\n{}\n```'.format(summary))
+
+    async def reload_strings(self, message, _stripped, _preferences):
+        # picks up strings changed in the database without a restart
+        if message.author.id != self.owner_id:
+            return
+
+        await self.do_database(STRING_CATALOG.reload)
+
+        await message.channel.send('Reloaded strings')
+
     @staticmethod
     async def help(message, _stripped, preferences):
         embed = discord.Embed(
@@ -387,8 +584,7 @@ class BotClient(discord.AutoShardedClient):
                 await message.channel.send(preferences.language.get_string('prefix/too_long'))
 
             else:
-                preferences.prefix = new
-                session.commit()
+                await client.do_database(partial(setattr, preferences, 'prefix', new))
 
                 await message.channel.send(preferences.language.get_string('prefix/success').format(
                     prefix=preferences.prefix))
@@ -411,37 +607,34 @@ class BotClient(discord.AutoShardedClient):
                 await message.channel.send(preferences.language['no_perms_restricted'])
 
             elif name == 'list':
-                alias_concat = ''
-
-                for alias in preferences.guild.aliases:
-                    alias_concat += '**{}**: `{}`\n'.format(alias.name, alias.command)
+                aliases = await self.do_database(
+                    lambda: ['**{}**: `{}`'.format(alias.name, alias.command) for alias in preferences.guild.aliases])
+                lines = itertools.chain(('Aliases: ',), aliases)
 
-                await message.channel.send('Aliases: \n{}'.format(alias_concat))
+                for listing in paginate(lines):
+                    await message.channel.send(listing)
 
             elif name == 'remove':
                 name = command
 
-                query = session.query(CommandAlias) \
-                    .filter(CommandAlias.name == name) \
-                    .filter(CommandAlias.guild == preferences.guild)
+                def _remove() -> int:
+                    return session.query(CommandAlias) \
+                        .filter(CommandAlias.name == name) \
+                        .filter(CommandAlias.guild == preferences.guild) \
+                        .delete(synchronize_session=False)
 
-                if query.first() is not None:
-                    query.delete(synchronize_session='fetch')
-                    await message.channel.send(preferences.language['alias/removed'].format(count=1))
-
-                else:
-                    await message.channel.send(preferences.language['alias/removed'].format(count=0))
+                count = await self.do_database(_remove)
+                await message.channel.send(preferences.language['alias/removed'].format(count=count))
 
             elif command is None:
                 # command not specified so look for existing alias
-                try:
-                    aliased_command = next(filter(lambda alias: alias.name == name, preferences.guild.aliases))
+                command = await self.do_database(
+                    lambda: next((alias.command for alias in preferences.guild.aliases if alias.name == name), None))
 
-                except StopIteration:
+                if command is None:
                     await message.channel.send(preferences.language['alias/not_found'].format(name=name))
 
                 else:
-                    command = aliased_command.command
                     split = command.split(' ')
 
                     command_obj = self.commands.get(split[0])
@@ -449,13 +642,13 @@ class BotClient(discord.AutoShardedClient):
                     if command_obj is None or command_obj.name == 'alias':
                         await message.channel.send(preferences.language['alias/invalid_command'])
 
-                    elif command_obj.check_permissions(message.author, preferences.guild):
+                    elif command_obj.check_permissions(message.author, preferences.guild_id):
                         await command_obj.func(message, ' '.join(split[1:]), preferences)
 
                     else:
                         await message.channel.send(
                             preferences.language[str(command_obj.permission_level)]
-                                .format(prefix=preferences.guild.prefix))
+                                .format(prefix=preferences.prefix))
 
             else:
                 # command provided so create new alias
@@ -463,21 +656,21 @@ class BotClient(discord.AutoShardedClient):
                     await message.channel.send(preferences.language['alias/invalid_command'])
 
                 else:
-                    if (alias := session.query(CommandAlias)
-                            .filter_by(guild=preferences.guild, name=name).first()) is not None:
+                    def _create():
+                        if (alias := session.query(CommandAlias)
+                                .filter_by(guild=preferences.guild, name=name).first()) is not None:
 
-                        alias.command = command
-
-                    else:
-                        alias = CommandAlias(guild=preferences.guild, command=command, name=name)
-                        session.add(alias)
+                            alias.command = command
 
-                    session.commit()
+                        else:
+                            alias = CommandAlias(guild=preferences.guild, command=command, name=name)
+                            session.add(alias)
 
+                    await self.do_database(_create)
                     await message.channel.send(preferences.language['alias/created'].format(name=name))
 
         else:
-            await message.channel.send(preferences.language['alias/help'].format(prefix=preferences.guild.prefix))
+            await message.channel.send(preferences.language['alias/help'].format(prefix=preferences.prefix))
 
     @staticmethod
     async def set_timezone(message, stripped, preferences):
@@ -495,40 +688,52 @@ class BotClient(discord.AutoShardedClient):
                     prefix=preferences.prefix, timezone=preferences.timezone)))
 
         else:
-            if stripped not in pytz.all_timezones:
-                await message.channel.send(
-                    embed=discord.Embed(description=preferences.language.get_string('timezone/no_timezone')))
+            timezone: typing.Optional[str] = TIMEZONES.resolve(stripped)
+
+            if timezone is None:
+                description = preferences.language.get_string('timezone/no_timezone')
+
+                if suggestions := TIMEZONES.suggest(stripped):
+                    description += '\n\n' + ', '.join('`{}`'.format(name) for name in suggestions)
+
+                await message.channel.send(embed=discord.Embed(description=description))
             else:
                 if admin:
-                    preferences.server_timezone = stripped
+                    await client.do_database(partial(setattr, preferences, 'server_timezone', timezone))
                 else:
-                    preferences.timezone = stripped
+                    await client.do_database(partial(setattr, preferences, 'timezone', timezone))
 
-                d = datetime.now(pytz.timezone(stripped))
+                d = datetime.now(TIMEZONES.zone(timezone))
 
                 await message.channel.send(embed=discord.Embed(
                     description=preferences.language.get_string(s).format(
-                        timezone=stripped, time=d.strftime('%H:%M:%S'))))
-
-                session.commit()
+                        timezone=timezone, time=d.strftime('%H:%M:%S'))))
 
     @staticmethod
     async def set_language(message, stripped, preferences):
 
-        new_lang = session.query(Language).filter(
-            (Language.code == stripped.upper()) | (Language.name == stripped.lower())).first()
+        def _set_language():
+            language = session.query(Language).filter(
+                (Language.code == stripped.upper()) | (Language.name == stripped.lower())).first()
 
-        if new_lang is not None:
-            preferences.language = new_lang.code
-            session.commit()
+            if language is not None:
+                preferences.language = language.code
+
+                return language, None
+
+            else:
+                return None, ['{} ({})'.format(lang.name.title(), lang.code.upper())
+                              for lang in session.query(Language)]
 
+        new_lang, languages = await client.do_database(_set_language)
+
+        if new_lang is not None:
             await message.channel.send(embed=discord.Embed(description=new_lang.get_string('lang/set_p')))
 
         else:
             await message.channel.send(
                 embed=discord.Embed(description=preferences.language.get_string('lang/invalid').format(
-                    '\n'.join(
-                        ['{} ({})'.format(lang.name.title(), lang.code.upper()) for lang in session.query(Language)])
+                    '\n'.join(languages)
                 )
                 )
             )
@@ -541,7 +746,7 @@ class BotClient(discord.AutoShardedClient):
         else:
             f_string = '%H:%M:%S'
 
-        t = datetime.now(pytz.timezone(preferences.timezone))
+        t = datetime.now(TIMEZONES.zone(preferences.timezone))
 
         await message.channel.send(preferences.language.get_string('clock/time').format(t.strftime(f_string)))
 
@@ -556,12 +761,21 @@ class BotClient(discord.AutoShardedClient):
 
         time_crop = stripped.split(' {} '.format(server.language['natural/send']))[0]
         message_crop = stripped.split(' {} '.format(server.language['natural/send']), 1)[1]
-        datetime_obj = await self.do_blocking(partial(dateparser.parse, time_crop, settings={
-            'TIMEZONE': server.timezone,
-            'TO_TIMEZONE': config.local_timezone,
-            'RELATIVE_BASE': datetime.now(pytz.timezone(server.timezone)).replace(tzinfo=None),
-            'PREFER_DATES_FROM': 'future'
-        }))
+        base = datetime.now(TIMEZONES.zone(server.timezone)).replace(tzinfo=None)
+
+        # the common shapes are parsed in place; only the rest goes to dateparser
+        datetime_obj = fast_parse(time_crop, server.timezone, config.local_timezone, base)
+
+        if datetime_obj is None:
+            try:
+                datetime_obj = await self.parse_time(time_crop, server.timezone, base, {
+                    'TO_TIMEZONE': config.local_timezone,
+                    'PREFER_DATES_FROM': 'future'
+                })
+
+            except ParserBusy:
+                await self.parser_busy(message)
+                return
 
         if datetime_obj is None:
             await message.channel.send(
@@ -577,18 +791,35 @@ class BotClient(discord.AutoShardedClient):
 
         interval_split = message_crop.split(' {} '.format(server.language['natural/every']))
         recurring: bool = False
-        interval: int = 0
+        interval: typing.Optional[int] = None
 
         if len(interval_split) > 1:
-            interval_dt = await self.do_blocking(partial(dateparser.parse, '1 ' + interval_split[-1]))
+            interval = parse_interval(interval_split[-1])
 
-            if interval_dt is None:
+            # phrases in other languages still go through dateparser
+            if interval is None:
+                interval_base = datetime.now()
+
+                try:
+                    interval_dt = await self.parse_time('1 ' + interval_split[-1], None, interval_base)
+
+                except ParserBusy:
+                    await self.parser_busy(message)
+                    return
+
+                if interval_dt is not None:
+                    interval = int(abs((interval_dt - interval_base).total_seconds()))
+
+            if interval is None:
                 pass
 
             elif await self.is_patron(message.author.id):
                 recurring = True
 
-                interval = abs((interval_dt - datetime.now()).total_seconds())
+                if (status := interval_status(interval)) is not None:
+                    await message.channel.send(embed=discord.Embed(description=server.language.get_string(
+                        REMIND_STRINGS[status]).format(min_interval=MIN_INTERVAL, max_time=MAX_TIME_DAYS)))
+                    return
 
                 message_crop = message_crop.rsplit(server.language.get_string('natural/every'), 1)[0]
 
@@ -598,13 +829,8 @@ class BotClient(discord.AutoShardedClient):
                 return
 
         mtime: int = int(datetime_obj.timestamp())
-        responses: typing.List[ReminderInformation] = []
-
-        for location_id in location_ids:
-            response: ReminderInformation = await self.create_reminder(message, location_id, message_crop, mtime,
-                                                                       interval=interval if recurring else None,
-                                                                       method='natural')
-            responses.append(response)
+        responses: typing.List[ReminderInformation] = await self.create_reminders(
+            message, location_ids, message_crop, mtime, interval=interval if recurring else None, method='natural')
 
         if len(responses) == 1:
             result: ReminderInformation = responses[0]
@@ -701,10 +927,15 @@ class BotClient(discord.AutoShardedClient):
 
     async def create_reminder(self, message: discord.Message, location: int, text: str, time: int,
                               interval: typing.Optional[int] = None, method: str = 'natural') -> ReminderInformation:
+        return (await self.create_reminders(message, [location], text, time, interval, method))[0]
+
+    async def create_reminders(self, message: discord.Message, locations: typing.List[int], text: str, time: int,
+                               interval: typing.Optional[int] = None, method: str = 'natural') \
+            -> typing.List[ReminderInformation]:
         ut: float = unix_time()
 
         if time > ut + MAX_TIME:
-            return ReminderInformation(CreateReminderResponse.LONG_TIME)
+            return [ReminderInformation(CreateReminderResponse.LONG_TIME) for _ in locations]
 
         elif time < ut:
 
@@ -712,80 +943,131 @@ class BotClient(discord.AutoShardedClient):
                 time = int(ut)
 
             else:
-                return ReminderInformation(CreateReminderResponse.PAST_TIME)
+                return [ReminderInformation(CreateReminderResponse.PAST_TIME) for _ in locations]
 
-        channel: typing.Optional[Channel] = None
-        user: typing.Optional[User] = None
+        interval_problem: typing.Optional[CreateReminderResponse] = None if interval is None else \
+            interval_status(interval)
 
-        creator: User = User.from_discord(message.author)
+        creator: UserSettings = USER_CACHE.get(message.author.id) or \
+            await self.do_database(partial(USER_CACHE.fetch, message.author.id))
 
-        # noinspection PyUnusedLocal
-        discord_channel: typing.Optional[typing.Union[discord.TextChannel, DMChannelId]] = None
+        discord_channels: typing.Dict[int, discord.TextChannel] = {}
+        channels: typing.Dict[int, ChannelSettings] = {}
+        users: typing.Dict[int, UserSettings] = {}
+        failed_webhooks: typing.Set[int] = set()
+        webhooks: typing.Dict[int, discord.Webhook] = {}
 
-        # command fired inside a guild
+        # command fired inside a guild. resolve every target up front so the rows can be written together
         if message.guild is not None:
-            discord_channel = message.guild.get_channel(location)
+            for location in locations:
+                if (discord_channel := message.guild.get_channel(location)) is not None:
+                    discord_channels[location] = discord_channel
 
-            if discord_channel is not None:  # if not a DM reminder
+                    if (channel := CHANNEL_CACHE.get(location)) is not None:
+                        channels[location] = channel
 
-                channel, _ = Channel.get_or_create(discord_channel)
+            if len(channels) < len(discord_channels):
+                guild_settings: GuildSettings = GUILD_CACHE.get(message.guild.id) or \
+                    await self.do_database(partial(GUILD_CACHE.fetch, message.guild.id))
 
-                try:
-                    await channel.attach_webhook(discord_channel)
+                channels.update(await self.do_database(partial(
+                    CHANNEL_CACHE.fetch_many,
+                    [c for location, c in discord_channels.items() if location not in channels],
+                    guild_settings.id)))
 
-                except discord.errors.HTTPException as e:
-                    logging.info(e)
-                    return ReminderInformation(CreateReminderResponse.NO_WEBHOOK)
+            users = await self.find_and_create_members(
+                [location for location in locations if location not in discord_channels], message.guild)
 
-                else:
-                    time += channel.nudge
+            if interval_problem is None:
+                needs_webhook = [c for location, c in discord_channels.items() if not channels[location].has_webhook]
 
-            else:
-                user = await self.find_and_create_member(location, message.guild)
+                for discord_channel, hook in zip(needs_webhook, await asyncio.gather(
+                        *(c.create_webhook(name='Reminders') for c in needs_webhook), return_exceptions=True)):
 
-                if user is None:
-                    return ReminderInformation(CreateReminderResponse.INVALID_TAG)
+                    if isinstance(hook, discord.errors.HTTPException):
+                        logging.info(hook)
+                        failed_webhooks.add(discord_channel.id)
 
-                discord_channel = DMChannelId(user.dm_channel, user.user)
+                    elif isinstance(hook, BaseException):
+                        raise hook
 
-        # command fired in a DM; only possible target is the DM itself
-        else:
-            user = User.from_discord(message.author)
-            discord_channel = DMChannelId(user.dm_channel, message.author.id)
+                    else:
+                        webhooks[channels[discord_channel.id].id] = hook
+
+        responses: typing.List[ReminderInformation] = []
+        # (channel row id, time) of each reminder to insert
+        rows: typing.List[typing.Tuple[int, int]] = []
+
+        for location in locations:
+            # command fired in a DM; only possible target is the DM itself
+            if message.guild is None:
+                target = DMChannelId(creator.dm_channel, message.author.id)
+                channel_id, reminder_time = creator.dm_channel, time
+
+            elif location in discord_channels:
+                target = discord_channels[location]
+                channel_id, reminder_time = channels[location].id, time + channels[location].nudge
 
-        if interval is not None:
-            if MIN_INTERVAL > interval:
-                return ReminderInformation(CreateReminderResponse.SHORT_INTERVAL)
+            elif location in users:
+                target = DMChannelId(users[location].dm_channel, location)
+                channel_id, reminder_time = users[location].dm_channel, time
 
-            elif interval > MAX_TIME:
-                return ReminderInformation(CreateReminderResponse.LONG_INTERVAL)
+            else:
+                responses.append(ReminderInformation(CreateReminderResponse.INVALID_TAG))
+                continue
+
+            if location in failed_webhooks:
+                responses.append(ReminderInformation(CreateReminderResponse.NO_WEBHOOK))
+
+            elif interval_problem is not None:
+                responses.append(ReminderInformation(interval_problem))
 
             else:
+                rows.append((channel_id, reminder_time))
+                responses.append(ReminderInformation(CreateReminderResponse.OK, channel=target, time=reminder_time))
+
+        def _insert_reminders():
+            for channel_id, hook in webhooks.items():
+                session.query(Channel) \
+                    .filter(Channel.id == channel_id) \
+                    .update({Channel.webhook_id: hook.id, Channel.webhook_token: hook.token},
+                            synchronize_session=False)
+
+            if rows:
                 # noinspection PyArgumentList
-                reminder = Reminder(
-                    message=Message(content=text),
-                    channel=channel or user.channel,
-                    time=time,
+                reminders = [Reminder(
+                    channel_id=channel_id,
+                    time=reminder_time,
                     enabled=True,
                     method=method,
                     interval=interval,
-                    set_by=creator.id)
-                session.add(reminder)
-                session.commit()
+                    set_by=creator.id) for channel_id, reminder_time in rows]
 
-        else:
-            # noinspection PyArgumentList
-            reminder = Reminder(
-                message=Message(content=text),
-                channel=channel or user.channel,
-                time=time,
-                enabled=True,
-                method=method,
-                set_by=creator.id)
-            session.add(reminder)
+                if config.share_messages:
+                    # reminders with the same text share one message row
+                    message_id = Message.intern(text)
+
+                    for reminder in reminders:
+                        reminder.message_id = message_id
+
+                else:
+                    for reminder in reminders:
+                        reminder.message = Message(content=text)
+
+                session.add_all(reminders)
+
+            # commit straight away, so the shared message row isn't held locked while the replies are sent
             session.commit()
 
-        return ReminderInformation(CreateReminderResponse.OK, channel=discord_channel, time=time)
+        for discord_channel in discord_channels.values():
+            if channels[discord_channel.id].id in webhooks:
+                # the webhook is only stored once the reminders commit
+                after_commit(partial(CHANNEL_CACHE.update, discord_channel.id, has_webhook=True))
+
+        if rows or webhooks:
+            await self.do_database(_insert_reminders)
+
+        return responses
 
     @staticmethod
     async def timer(message, stripped, preferences):
@@ -795,12 +1077,15 @@ class BotClient(discord.AutoShardedClient):
         else:
             owner = message.guild.id
 
+        if (timers := TIMER_CACHE.get(owner)) is None:
+            timers = await client.do_database(partial(TIMER_CACHE.fetch, owner))
+
         if stripped == 'list':
-            timers = session.query(Timer).filter(Timer.owner == owner)
+            now = datetime.now()
 
             e = discord.Embed(title='Timers')
             for timer in timers:
-                delta = int((datetime.now() - timer.start_time).total_seconds())
+                delta = int((now - timer.start_time).total_seconds())
                 minutes, seconds = divmod(delta, 60)
                 hours, minutes = divmod(minutes, 60)
                 e.add_field(name=timer.name, value="{:02d}:{:02d}:{:02d}".format(hours, minutes, seconds))
@@ -808,41 +1093,29 @@ class BotClient(discord.AutoShardedClient):
             await message.channel.send(embed=e)
 
         elif stripped.startswith('start'):
-            timers = session.query(Timer).filter(Timer.owner == owner)
-
-            if timers.count() >= 25:
+            if len(timers) >= MAX_TIMERS:
                 await message.channel.send(preferences.language.get_string('timer/limit'))
 
             else:
-                n = stripped.split(' ')[1:2] or 'New timer #{}'.format(timers.count() + 1)
+                n = ' '.join(stripped.split(' ')[1:]) or 'New timer #{}'.format(len(timers) + 1)
 
                 if len(n) > 32:
                     await message.channel.send(preferences.language.get_string('timer/name_length').format(len(n)))
 
-                elif n in [x.name for x in timers]:
+                elif not await client.do_database(partial(TIMER_CACHE.start, owner, n)):
                     await message.channel.send(preferences.language.get_string('timer/unique'))
 
                 else:
-                    t = Timer(name=n, owner=owner)
-
-                    session.add(t)
-                    session.commit()
-
                     await message.channel.send(preferences.language.get_string('timer/success'))
 
         elif stripped.startswith('delete '):
 
             n = ' '.join(stripped.split(' ')[1:])
 
-            timers = session.query(Timer).filter(Timer.owner == owner).filter(Timer.name == n)
-
-            if timers.count() < 1:
+            if not await client.do_database(partial(TIMER_CACHE.delete, owner, n)):
                 await message.channel.send(preferences.language.get_string('timer/not_found'))
 
             else:
-                timers.delete(synchronize_session='fetch')
-                session.commit()
-
                 await message.channel.send(preferences.language.get_string('timer/deleted'))
 
         else:
@@ -853,11 +1126,15 @@ class BotClient(discord.AutoShardedClient):
 
         target_channel = message.channel_mentions[0] if len(message.channel_mentions) > 0 else message.channel
 
-        channel, _ = Channel.get_or_create(target_channel)
+        def _toggle():
+            channel, _ = Channel.get_or_create(target_channel)
 
-        channel.blacklisted = not channel.blacklisted
+            channel.blacklisted = not channel.blacklisted
+            after_commit(partial(CHANNEL_CACHE.update, target_channel.id, blacklisted=channel.blacklisted))
 
-        if channel.blacklisted:
+            return channel.blacklisted
+
+        if await client.do_database(_toggle):
             await message.channel.send(
                 embed=discord.Embed(description=preferences.language.get_string('blacklist/added')))
 
@@ -865,8 +1142,6 @@ class BotClient(discord.AutoShardedClient):
             await message.channel.send(
                 embed=discord.Embed(description=preferences.language.get_string('blacklist/removed')))
 
-        session.commit()
-
     async def restrict(self, message, stripped, preferences):
 
         role_tag = re.search(r'<@&([0-9]+)>', stripped)
@@ -876,26 +1151,28 @@ class BotClient(discord.AutoShardedClient):
         if len(args) == 0:
             if role_tag is None:
                 # no parameters given so just show existing
+                restrictions = await self.do_database(
+                    lambda: ['{} can use `{}`'.format(r.role, r.command) for r in preferences.command_restrictions])
+
                 await message.channel.send(
                     embed=discord.Embed(
                         description=preferences.language.get_string('restrict/allowed').format(
-                            '\n'.join(
-                                ['{} can use `{}`'.format(r.role, r.command)
-                                 for r in preferences.command_restrictions]
-                            )
+                            '\n'.join(restrictions)
                         )
                     )
                 )
 
             else:
                 # only a role is given so delete all the settings for this role
-                role_query = preferences.guild.roles.filter(Role.role == int(role_tag.group(1)))
+                def _disable():
+                    role_query = preferences.guild.roles.filter(Role.role == int(role_tag.group(1)))
 
-                if (role := role_query.first()) is not None:
-                    preferences.command_restrictions \
-                        .filter(CommandRestriction.role == role) \
-                        .delete(synchronize_session='fetch')
+                    if (role := role_query.first()) is not None:
+                        preferences.command_restrictions \
+                            .filter(CommandRestriction.role == role) \
+                            .delete(synchronize_session='fetch')
 
+                await self.do_database(_disable)
                 await message.channel.send(
                     embed=discord.Embed(description=preferences.language.get_string('restrict/disabled')))
 
@@ -907,43 +1184,55 @@ class BotClient(discord.AutoShardedClient):
         else:
             # enable permissions for role for selected commands
             role_id: int = int(role_tag.group(1))
-            enabled: bool = False
 
-            for command in args:
-                c: typing.Optional[Command] = self.commands.get(command)
+            def _enable() -> typing.Tuple[bool, typing.List[str]]:
+                # whether a restriction was added, and the commands that can't be restricted
+                enabled: bool = False
+                failures: typing.List[str] = []
 
-                if c is not None and c.permission_level == PermissionLevels.MANAGED:
-                    role_query = preferences.guild.roles.filter(Role.role == role_id)
+                for command in args:
+                    c: typing.Optional[Command] = self.commands.get(command)
 
-                    if (role := role_query.first()) is not None:
+                    if c is not None and c.permission_level == PermissionLevels.MANAGED:
+                        role_query = preferences.guild.roles.filter(Role.role == role_id)
+
+                        if (role := role_query.first()) is not None:
+
+                            q = preferences.command_restrictions \
+                                .filter(CommandRestriction.command == c.name) \
+                                .filter(CommandRestriction.role == role)
+
+                            if q.first() is None:
+                                new_restriction = CommandRestriction(guild_id=preferences.guild.id, command=c.name,
+                                                                     role=role)
+
+                                enabled = True
 
-                        q = preferences.command_restrictions \
-                            .filter(CommandRestriction.command == c.name) \
-                            .filter(CommandRestriction.role == role)
+                                session.add(new_restriction)
 
-                        if q.first() is None:
+                        else:
+                            role = Role(role=role_id, guild=preferences.guild)
                             new_restriction = CommandRestriction(guild_id=preferences.guild.id, command=c.name,
                                                                  role=role)
 
-                            enabled = True
-
                             session.add(new_restriction)
 
                     else:
-                        role = Role(role=role_id, guild=preferences.guild)
-                        new_restriction = CommandRestriction(guild_id=preferences.guild.id, command=c.name, role=role)
+                        failures.append(command)
 
-                        session.add(new_restriction)
+                return enabled, failures
 
-                else:
-                    await message.channel.send(embed=discord.Embed(
-                        description=preferences.language.get_string('restrict/failure').format(command=command)))
+            enabled, failures = await self.do_database(_enable)
+
+            for command in failures:
+                await message.channel.send(embed=discord.Embed(
+                    description=preferences.language.get_string('restrict/failure').format(command=command)))
 
             if enabled:
                 await message.channel.send(embed=discord.Embed(
                     description=preferences.language.get_string('restrict/enabled')))
 
-        session.commit()
+        after_commit(partial(RESTRICTION_CACHE.pop, preferences.guild_id))
 
     async def todo_user(self, message, stripped, preferences):
         await self.todo_command(message, stripped, preferences, TodoScope.USER)
@@ -956,77 +1245,121 @@ class BotClient(discord.AutoShardedClient):
 
     @staticmethod
     async def todo_command(message, stripped, preferences, scope):
-        if scope == TodoScope.CHANNEL:
-            location, _ = Channel.get_or_create(message.channel)
-            location_name = 'Channel'
-            todos = location.todo_list
-            channel = location
-            guild = preferences.guild
-
-        elif scope == TodoScope.USER:
-            location = preferences.user
-            location_name = 'User'
-            todos = location.todo_list.filter(Todo.guild_id.is_(None))
-            channel = None
-            guild = None
+        def _location():
+            # the list's query, and the channel and server its new items belong to
+            if scope == TodoScope.CHANNEL:
+                location, _ = Channel.get_or_create(message.channel)
 
-        else:
-            location = preferences.guild
-            location_name = 'Server'
-            todos = location.todo_list.filter(Todo.channel_id.is_(None))
-            channel = None
-            guild = preferences.guild
+                return location.todo_list, location, preferences.guild
+
+            elif scope == TodoScope.USER:
+                return preferences.user.todo_list.filter(Todo.guild_id.is_(None)), None, None
+
+            else:
+                return preferences.guild.todo_list.filter(Todo.channel_id.is_(None)), None, preferences.guild
+
+        todos, channel, guild = await client.do_database(_location)
+        location_name = {TodoScope.CHANNEL: 'Channel', TodoScope.USER: 'User'}.get(scope, 'Server')
 
         command = 'todo {}'.format(location_name.lower())
 
         splits = stripped.split(' ')
 
-        if len(splits) == 1 and splits[0] == '':
-            msg = []
-            for i, todo in enumerate(todos, start=1):
-                msg.append('\n{}{}: {}'.format(
-                    i,
+        def todo_lines():
+            for todo in todos.order_by(Todo.position):
+                yield '{}{}: {}'.format(
+                    todo.position,
                     ' (server)' if todo.channel_id is None and scope == TodoScope.CHANNEL else '',
                     todo.value)
-                )
 
-            if len(msg) == 0:
-                msg.append(preferences.language.get_string('todo/add').format(
-                    prefix=preferences.prefix, command=command))
+        async def send_list():
+            empty = True
 
-            s = ''
-            for item in msg:
-                if len(item) + len(s) < 2048:
-                    s += item
-                else:
-                    await message.channel.send(
-                        embed=discord.Embed(title='{} TODO'.format(location_name), description=s))
-                    s = ''
+            for page in paginate(await client.do_database(lambda: list(todo_lines())), EMBED_LIMIT):
+                empty = False
+                await message.channel.send(embed=discord.Embed(title='{} TODO'.format(location_name), description=page))
+
+            if empty:
+                await message.channel.send(embed=discord.Embed(
+                    title='{} TODO'.format(location_name),
+                    description=preferences.language.get_string('todo/add').format(
+                        prefix=preferences.prefix, command=command)))
 
-            if len(s) > 0:
-                await message.channel.send(embed=discord.Embed(title='{} TODO'.format(location_name), description=s))
+        if len(splits) == 1 and splits[0] == '':
+            await send_list()
 
         elif len(splits) >= 2:
             if splits[0] == 'add':
                 s = ' '.join(splits[1:])
 
-                todo = Todo(value=s, guild=guild, user=preferences.user, channel=channel)
-                session.add(todo)
+                def _add():
+                    # locks the end of the list, so two items added at once can't take the same position. the commit
+                    # lets it go before anything is sent
+                    last = todos.with_entities(func.max(Todo.position)).with_for_update().scalar() or 0
+
+                    session.add(Todo(value=s, guild=guild, user=preferences.user, channel=channel, position=last + 1))
+                    session.commit()
+
+                await client.do_database(_add)
                 await message.channel.send(preferences.language.get_string('todo/added').format(name=s))
 
             elif splits[0] == 'remove':
                 try:
-                    pos = int(splits[1]) - 1
+                    pos = int(splits[1])
 
-                    if pos < 0:
-                        raise IndexError
+                    def _remove():
+                        todo = todos.filter(Todo.position == pos).with_for_update().first()
 
-                    else:
-                        todo = session.query(Todo).filter(Todo.id == todos[pos].id).first()
-                        session.query(Todo).filter(Todo.id == todos[pos].id).delete(
-                            synchronize_session='fetch')
+                        if todo is None:
+                            raise IndexError
 
-                        await message.channel.send(preferences.language.get_string('todo/removed').format(todo.value))
+                        value = todo.value
+
+                        # close the gap the item leaves
+                        todos.filter(Todo.id == todo.id).delete(synchronize_session=False)
+                        todos.filter(Todo.position > pos) \
+                            .update({Todo.position: Todo.position - 1}, synchronize_session=False)
+                        session.commit()
+
+                        return value
+
+                    value = await client.do_database(_remove)
+
+                    await message.channel.send(preferences.language.get_string('todo/removed').format(value))
+
+                except ValueError:
+                    await message.channel.send(
+                        preferences.language.get_string('todo/error_value').format(
+                            prefix=preferences.prefix, command=command))
+
+                except IndexError:
+                    await message.channel.send(preferences.language.get_string('todo/error_index'))
+
+            elif splits[0] == 'move' and len(splits) == 3:
+                try:
+                    pos, new_pos = int(splits[1]), int(splits[2])
+
+                    def _move():
+                        todo = todos.filter(Todo.position == pos).with_for_update().first()
+
+                        # positions run from 1 to the length of the list
+                        if todo is None or not 1 <= new_pos <= todos.count():
+                            raise IndexError
+
+                        # close the gap the item leaves and open one where it goes
+                        if pos < new_pos:
+                            todos.filter(Todo.position > pos, Todo.position <= new_pos) \
+                                .update({Todo.position: Todo.position - 1}, synchronize_session=False)
+
+                        elif new_pos < pos:
+                            todos.filter(Todo.position >= new_pos, Todo.position < pos) \
+                                .update({Todo.position: Todo.position + 1}, synchronize_session=False)
+
+                        todos.filter(Todo.id == todo.id).update({Todo.position: new_pos}, synchronize_session=False)
+                        session.commit()
+
+                    await client.do_database(_move)
+                    await send_list()
 
                 except ValueError:
                     await message.channel.send(
@@ -1044,23 +1377,27 @@ class BotClient(discord.AutoShardedClient):
             if stripped == 'clear':
                 await message.channel.send(
                     preferences.language.get_string('todo/confirm').format(
-                        todos.count(),
+                        await client.do_database(todos.count),
                         location_name.lower()
                     )
                 )
 
+                # don't hold this command's locks while waiting on a person
+                await client.commit()
+
                 try:
-                    confirm = await client.wait_for('message',
-                                                    check=lambda m:
-                                                        m.author == message.author and m.channel == message.channel,
-                                                    timeout=30)
+                    with COMMAND_STATS.waiting():
+                        confirm = await client.wait_for('message',
+                                                        check=lambda m:
+                                                            m.author == message.author and m.channel == message.channel,
+                                                        timeout=30)
 
                 except asyncio.exceptions.TimeoutError:
                     pass
 
                 else:
                     if confirm.content.lower() == 'yes':
-                        todos.delete(synchronize_session='fetch')
+                        await client.do_database(partial(todos.delete, synchronize_session=False))
                         await message.channel.send(preferences.language.get_string('todo/cleared'))
 
                     else:
@@ -1070,50 +1407,91 @@ class BotClient(discord.AutoShardedClient):
                 await message.channel.send(
                     preferences.language.get_string('todo/help').format(prefix=preferences.prefix, command=command))
 
-        session.commit()
-
     @staticmethod
-    async def delete(message, _stripped, preferences):
+    async def delete(message, stripped, preferences):
+        page_arg = re.search(r'page (\d+)', stripped)
+        page: int = 1 if page_arg is None else max(1, int(page_arg.group(1)))
+
+        # one query for each page, rather than one per channel plus lazy loads for every row
+        reminder_query = session.query(reminder_content, Reminder.time, Channel.channel, Reminder.id) \
+            .select_from(Reminder) \
+            .join(Message, Reminder.message_id == Message.id) \
+            .outerjoin(Embed, Message.embed_id == Embed.id) \
+            .join(Channel, Reminder.channel_id == Channel.id)
+
         if message.guild is not None:
-            channels = preferences.guild.channels
-            reminders = itertools.chain(*[c.reminders for c in channels])
+            reminder_query = reminder_query.filter(Channel.guild_id == preferences.guild_id)
 
         else:
-            reminders = preferences.user.channel.reminders
+            reminder_query = reminder_query.filter(Reminder.channel_id == preferences.dm_channel)
 
-        await message.channel.send(preferences.language.get_string('del/listing'))
+        # filters like `before:25/12 method:natural text:"stand up" disabled #channel` delete without a listing
+        filter_pattern = r'(before|after|method|text):(?:"([^"]*)"|(\S+))'
+        filters = []
 
-        enumerated_reminders = [x for x in enumerate(reminders, start=1)]
+        for name, quoted, bare in re.findall(filter_pattern, stripped):
+            value = quoted or bare
 
-        s = ''
-        for count, reminder in enumerated_reminders:
-            string = '''**{}**: '{}' *{}* at {}\n'''.format(
-                count,
-                reminder.message_content(),
-                reminder.channel,
-                datetime.fromtimestamp(reminder.time, pytz.timezone(preferences.timezone)).strftime(
-                    '%Y-%m-%d %H:%M:%S'))
+            if name in ('before', 'after'):
+                try:
+                    t = TimeExtractor(value, preferences.timezone).extract_exact()
+
+                except InvalidTime:
+                    await message.channel.send(
+                        embed=discord.Embed(description=preferences.language.get_string('remind/invalid_time')))
+                    return
+
+                filters.append(Reminder.time < t if name == 'before' else Reminder.time > t)
+
+            elif name == 'method':
+                filters.append(Reminder.method == value.lower())
 
-            if len(s) + len(string) > 2000:
-                await message.channel.send(s)
-                s = string
             else:
-                s += string
+                filters.append(reminder_content.contains(value, autoescape=True))
 
-        if s:
-            await message.channel.send(s)
+        if 'disabled' in re.sub(filter_pattern, '', stripped).split(' '):
+            filters.append(Reminder.enabled.is_(False))
 
-        await message.channel.send(preferences.language.get_string('del/listed'))
+        if message.channel_mentions:
+            filters.append(Channel.channel.in_([c.id for c in message.channel_mentions]))
 
-        try:
-            num = await client.wait_for('message',
-                                        check=lambda m: m.author == message.author and m.channel == message.channel,
-                                        timeout=30)
+        if filters:
+            await client.bulk_delete(message, reminder_query.filter(*filters), preferences)
+            return
 
-        except asyncio.exceptions.TimeoutError:
-            pass
+        pages = ReminderPages(reminder_query, LISTING_PAGE_SIZE)
 
-        else:
+        await message.channel.send(preferences.language.get_string('del/listing'))
+
+        # numbers run on from one page to the next, so any reminder listed so far can be picked
+        reminder_ids: typing.Dict[int, int] = {}
+
+        while True:
+            reminders, more = await client.do_database(partial(pages.fetch, page))
+
+            def reminder_lines():
+                for count, (content, time, channel, reminder_id) in enumerate(
+                        reminders, start=(page - 1) * LISTING_PAGE_SIZE + 1):
+                    reminder_ids[count] = reminder_id
+
+                    yield '''**{}**: '{}' *<#{}>* at {}'''.format(
+                        count,
+                        content,
+                        channel,
+                        datetime.fromtimestamp(time, TIMEZONES.zone(preferences.timezone)).strftime(
+                            '%Y-%m-%d %H:%M:%S'))
+
+            for listing in paginate(reminder_lines()):
+                await message.channel.send(listing)
+
+            await message.channel.send(preferences.language.get_string('del/listed'))
+
+            page, num = await client.turn_page(message, page, more)
+
+            if page is None:
+                break
+
+        if num is not None:
             num_content = num.content.replace(',', ' ')
             removal_ids: typing.Set[int] = set()
 
@@ -1124,24 +1502,91 @@ class BotClient(discord.AutoShardedClient):
                 pass
 
             else:
-                for count, reminder in enumerated_reminders:
+                for count, reminder_id in reminder_ids.items():
                     if count in nums:
-                        removal_ids.add(reminder.id)
+                        removal_ids.add(reminder_id)
                         nums.remove(count)
 
-                if message.guild is not None:
-                    deletion_event = Event(
-                        event_name='delete', bulk_count=len(removal_ids), guild=preferences.guild,
-                        user=preferences.user)
-                    session.add(deletion_event)
+                def _delete():
+                    if message.guild is not None:
+                        deletion_event = Event(
+                            event_name='delete', bulk_count=len(removal_ids), guild=preferences.guild,
+                            user=preferences.user)
+                        session.add(deletion_event)
 
-                session.query(Reminder).filter(Reminder.id.in_(removal_ids)).delete(synchronize_session='fetch')
-                session.commit()
+                    session.query(Reminder).filter(Reminder.id.in_(removal_ids)).delete(synchronize_session=False)
+
+                await client.do_database(_delete)
 
             await message.channel.send(preferences.language.get_string('del/count').format(len(removal_ids)))
 
-    @staticmethod
-    async def look(message, stripped, preferences):
+    async def bulk_delete(self, message, reminder_query, preferences):
+        # reminder_query selects (content, time, channel, id) of the reminders to delete
+        def _preview():
+            count = reminder_query.with_entities(func.count(Reminder.id)).scalar()
+
+            return count, reminder_query.order_by(Reminder.time, Reminder.id).limit(DELETE_PREVIEW_SIZE).all()
+
+        count, preview = await self.do_database(_preview)
+
+        if count == 0:
+            await message.channel.send(preferences.language.get_string('del/count').format(0))
+            return
+
+        lines = itertools.chain(
+            ('\'{}\' *<#{}>* at {}'.format(
+                content,
+                channel,
+                datetime.fromtimestamp(time, TIMEZONES.zone(preferences.timezone)).strftime('%Y-%m-%d %H:%M:%S'))
+             for content, time, channel, _ in preview),
+            # the dry run: how many would go, and how to confirm it
+            ('...', ) if count > len(preview) else (),
+            (preferences.language.get_string('del/confirm_bulk').format(count), ))
+
+        for listing in paginate(lines):
+            await message.channel.send(listing)
+
+        # don't hold this command's locks while waiting on a person
+        await self.commit()
+
+        try:
+            with COMMAND_STATS.waiting():
+                confirm = await self.wait_for('message',
+                                              check=lambda m:
+                                                  m.author == message.author and m.channel == message.channel,
+                                              timeout=30)
+
+        except asyncio.exceptions.TimeoutError:
+            return
+
+        if confirm.content.strip().lower() != 'yes':
+            await message.channel.send(preferences.language.get_string('del/count').format(0))
+            return
+
+        def _delete() -> int:
+            ids_query = reminder_query.with_entities(Reminder.id).limit(DELETE_CHUNK_SIZE)
+            deleted = 0
+
+            # MySQL can't delete from a table it selects from in the same statement, so take the ids a chunk at a time
+            while reminder_ids := [reminder_id for reminder_id, in ids_query]:
+                deleted += session.query(Reminder) \
+                    .filter(Reminder.id.in_(reminder_ids)) \
+                    .delete(synchronize_session=False)
+
+                # each chunk commits by itself, so a large cleanup never holds every row's lock at once
+                session.commit()
+
+            return deleted
+
+        deleted = await self.do_database(_delete)
+
+        if message.guild is not None:
+            session.add(Event(
+                event_name='delete', bulk_count=deleted, guild_id=preferences.guild_id, user_id=preferences.user_id))
+
+        await message.channel.send(preferences.language.get_string('del/count').format(deleted))
+
+    async def look(self, message, stripped, preferences):
 
         def relative_time(t):
             days, seconds = divmod(int(t - unix_time()), 86400)
@@ -1157,7 +1602,14 @@ class BotClient(discord.AutoShardedClient):
             return ', '.join(sections)
 
         def absolute_time(t):
-            return datetime.fromtimestamp(t, pytz.timezone(preferences.timezone)).strftime('%Y-%m-%d %H:%M:%S')
+            return datetime.fromtimestamp(t, TIMEZONES.zone(preferences.timezone)).strftime('%Y-%m-%d %H:%M:%S')
+
+        page_arg = re.search(r'page (\d+)', stripped)
+        page: int = 1
+
+        if page_arg is not None:
+            page = max(1, int(page_arg.group(1)))
+            stripped = stripped.replace(page_arg.group(0), '')
 
         r = re.search(r'(\d+)', stripped)
 
@@ -1177,61 +1629,61 @@ class BotClient(discord.AutoShardedClient):
             time_func = relative_time
 
         if message.guild is None:
-            channel = preferences.user.channel
-            new = False
+            channel_id = preferences.dm_channel
 
         else:
             discord_channel = message.channel_mentions[0] if len(message.channel_mentions) > 0 else message.channel
 
-            channel, new = Channel.get_or_create(discord_channel)
+            channel = CHANNEL_CACHE.get(discord_channel.id) or \
+                await self.do_database(partial(CHANNEL_CACHE.fetch, discord_channel))
+            channel_id = channel.id
 
-        if new:
-            await message.channel.send(preferences.language.get_string('look/no_reminders'))
+        reminder_query = session.query(reminder_content, Reminder.time, Reminder.enabled) \
+            .select_from(Reminder) \
+            .join(Message, Reminder.message_id == Message.id) \
+            .outerjoin(Embed, Message.embed_id == Embed.id) \
+            .filter(Reminder.channel_id == channel_id)
 
-        else:
-            reminder_query = channel.reminders.order_by(Reminder.time)
+        if not show_disabled:
+            reminder_query = reminder_query.filter(Reminder.enabled)
 
-            if not show_disabled:
-                reminder_query = reminder_query.filter(Reminder.enabled)
+        pages = ReminderPages(reminder_query, LISTING_PAGE_SIZE, limit)
+        first_page: bool = True
 
-            if limit is not None:
-                reminder_query = reminder_query.limit(limit)
+        while page is not None:
+            reminders, more = await self.do_database(partial(pages.fetch, page))
 
-            if reminder_query.count() > 0:
+            if len(reminders) == 0:
+                await message.channel.send(preferences.language.get_string('look/no_reminders'))
+                break
+
+            if first_page:
                 if limit is not None:
                     await message.channel.send(preferences.language.get_string('look/listing_limited').format(
-                        reminder_query.count()))
+                        await self.do_database(pages.count)))
 
                 else:
                     await message.channel.send(preferences.language.get_string('look/listing'))
 
-                s = ''
-                for reminder in reminder_query:
-                    string = '\'{}\' *{}* **{}** {}\n'.format(
-                        reminder.message_content(),
-                        preferences.language.get_string('look/inter'),
-                        time_func(reminder.time),
-                        '' if reminder.enabled else '`disabled`')
-
-                    if len(s) + len(string) > 2000:
-                        await message.channel.send(s)
-                        s = string
-                    else:
-                        s += string
+                first_page = False
 
-                await message.channel.send(s)
+            lines = ('\'{}\' *{}* **{}** {}'.format(
+                content,
+                preferences.language.get_string('look/inter'),
+                time_func(time),
+                '' if enabled else '`disabled`') for content, time, enabled in reminders)
 
-            else:
-                await message.channel.send(preferences.language.get_string('look/no_reminders'))
+            for listing in paginate(lines):
+                await message.channel.send(listing)
+
+            if page == 1 and not more:
+                break
+
+            page, _ = await self.turn_page(message, page, more)
 
     @staticmethod
     async def offset_reminders(message, stripped, preferences):
 
-        if message.guild is None:
-            reminders = preferences.user.channel.reminders
-        else:
-            reminders = itertools.chain(*[channel.reminders for channel in preferences.guild.channels])
-
         time_parser = TimeExtractor(stripped, preferences.timezone)
 
         try:
@@ -1247,18 +1699,26 @@ class BotClient(discord.AutoShardedClient):
                     description=preferences.language.get_string('offset/help').format(prefix=preferences.prefix)))
 
             else:
-                c = 0
-                for r in reminders:
-                    c += 1
-                    r.time += time
+                def _offset() -> int:
+                    # one UPDATE for the whole guild, without loading any reminder
+                    if message.guild is None:
+                        channel_filter = Reminder.channel_id == preferences.user.dm_channel
+
+                    else:
+                        channel_filter = Reminder.channel_id.in_(
+                            session.query(Channel.id).filter(Channel.guild_id == preferences.guild.id).subquery())
+
+                    return session.query(Reminder) \
+                        .filter(channel_filter) \
+                        .update({Reminder.time: Reminder.time + time}, synchronize_session=False)
+
+                c = await client.do_database(_offset)
 
                 if message.guild is not None:
                     edit_event = Event(
-                        event_name='edit', bulk_count=c, guild=preferences.guild, user=preferences.user)
+                        event_name='edit', bulk_count=c, guild_id=preferences.guild_id, user_id=preferences.user_id)
                     session.add(edit_event)
 
-                session.commit()
-
                 await message.channel.send(
                     embed=discord.Embed(description=preferences.language.get_string('offset/success').format(time)))
 
@@ -1276,11 +1736,13 @@ class BotClient(discord.AutoShardedClient):
 
         else:
             if 2 ** 15 > t > -2 ** 15:
-                channel, _ = Channel.get_or_create(message.channel)
+                def _nudge():
+                    channel, _ = Channel.get_or_create(message.channel)
 
-                channel.nudge = t
+                    channel.nudge = t
+                    after_commit(partial(CHANNEL_CACHE.update, message.channel.id, nudge=t))
 
-                session.commit()
+                await client.do_database(_nudge)
 
                 await message.channel.send(
                     embed=discord.Embed(description=preferences.language.get_string('nudge/success').format(t)))
@@ -1292,8 +1754,6 @@ class BotClient(discord.AutoShardedClient):
     @staticmethod
     async def pause_channel(message, stripped, preferences):
 
-        channel, _ = Channel.get_or_create(message.channel)
-
         if len(stripped) > 0:
             # argument provided for time
             time_parser = TimeExtractor(stripped, preferences.timezone)
@@ -1306,11 +1766,19 @@ class BotClient(discord.AutoShardedClient):
                     description=preferences.language['pause/invalid_time']))
 
             else:
-                channel.paused = True
-                channel.paused_until = datetime.now() + timedelta(seconds=t)
+                paused_until = datetime.now() + timedelta(seconds=t)
+
+                def _pause():
+                    channel, _ = Channel.get_or_create(message.channel)
+
+                    channel.paused = True
+                    channel.paused_until = paused_until
+                    after_commit(partial(CHANNEL_CACHE.update, message.channel.id, paused=True))
+
+                await client.do_database(_pause)
 
-                display = channel.paused_until \
-                    .astimezone(pytz.timezone(preferences.timezone)) \
+                display = paused_until \
+                    .astimezone(TIMEZONES.zone(preferences.timezone)) \
                     .strftime('%Y-%m-%d, %H:%M:%S')
 
                 await message.channel.send(
@@ -1318,10 +1786,16 @@ class BotClient(discord.AutoShardedClient):
 
         else:
             # otherwise toggle the paused status and clear the time
-            channel.paused = not channel.paused
-            channel.paused_until = None
+            def _toggle():
+                channel, _ = Channel.get_or_create(message.channel)
+
+                channel.paused = not channel.paused
+                channel.paused_until = None
+                after_commit(partial(CHANNEL_CACHE.update, message.channel.id, paused=channel.paused))
 
-            if channel.paused:
+                return channel.paused
+
+            if await client.do_database(_toggle):
                 await message.channel.send(
                     embed=discord.Embed(description=preferences.language['pause/paused_indefinite']))
 
@@ -1336,6 +1810,8 @@ intents.messages = True
 
 config: Config = Config(filename='config.ini')
 
+COMMAND_STATS.instrument_engine(engine)
+
 if (config.min_shard and config.max_shard and config.shard_count) is not None:
     client = BotClient(
         shard_ids=[x for x in range(config.min_shard, config.max_shard + 1)],
@@ -1354,4 +1830,5 @@ else:
         allowed_mentions=discord.AllowedMentions.none(),
         fetch_offline_members=False)
 
-client.run(config.token)
+if __name__ == '__main__':
+    client.run(config.token)
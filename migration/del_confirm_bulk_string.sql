@@ -0,0 +1,4 @@
+-- the confirmation a filtered del asks for. other languages fall back to this until the languages repo translates it
+insert into strings (name, language, value)
+    select 'del/confirm_bulk', 'EN', '**{}** reminders will be deleted. Reply `yes` to confirm'
+    where not exists (select 1 from strings where name = 'del/confirm_bulk' and language = 'EN');
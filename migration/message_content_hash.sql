@@ -0,0 +1,30 @@
+-- let reminders with the same plain text share one message row
+alter table messages add column content_hash binary(32) after content;
+-- last time a reminder took up a shared row, so the sweep leaves rows being taken up again alone for a while
+alter table messages add column interned_at timestamp null after content_hash;
+update messages set content_hash = unhex(sha2(content, 256))
+    where embed_id is null and attachment is null and tts = 0;
+
+-- point every reminder at the oldest message with its content, then drop the copies
+update reminders r
+    inner join messages m on r.message_id = m.id
+    inner join (select content_hash, min(id) as id from messages where content_hash is not null group by content_hash) k
+        on m.content_hash = k.content_hash
+    set r.message_id = k.id;
+delete m from messages m left join reminders r on r.message_id = m.id
+    where m.content_hash is not null and r.id is null;
+
+alter table messages add unique (content_hash);
+update messages set interned_at = now() where content_hash is not null;
+
+-- unshared messages still go with their reminder. shared ones are swept up once no reminder uses them, since a
+-- reminder may be taking one up again while the last is deleted
+drop trigger message_cleanup;
+create trigger message_cleanup after delete on reminders
+for each row
+    delete from messages where id = OLD.message_id and content_hash is null;
+
+create event message_sweep
+on schedule every 1 hour
+do delete m from messages m left join reminders r on r.message_id = m.id
+    where m.content_hash is not null and r.id is null and m.interned_at < date_sub(now(), interval 1 hour);
@@ -0,0 +1,2 @@
+-- look and del page through a channel's reminders by (time, id)
+alter table reminders add index channel_time (channel_id, `time`, id);
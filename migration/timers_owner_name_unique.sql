@@ -0,0 +1,3 @@
+-- a timer's name is unique to its owner; keep the oldest of any duplicates
+delete t from timers t inner join timers k on t.owner = k.owner and t.name = k.name and t.id > k.id;
+alter table timers add unique key owner_name (owner, name);
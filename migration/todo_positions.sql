@@ -0,0 +1,16 @@
+-- give todo items an explicit order within their list, keeping the order they were added in
+alter table todos add column position int unsigned not null default 0 after value;
+
+-- an item is in its channel's list if it has a channel, else its server's if it has a server, else its user's
+update todos t inner join (
+    select id, row_number() over (
+        partition by channel_id,
+            if(channel_id is null, guild_id, null),
+            if(channel_id is null and guild_id is null, user_id, null)
+        order by id) as position
+    from todos) p on t.id = p.id
+set t.position = p.position;
+
+alter table todos add index user_position (user_id, guild_id, channel_id, position);
+alter table todos add index guild_position (guild_id, channel_id, position);
+alter table todos add index channel_position (channel_id, position);
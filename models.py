@@ -1,13 +1,19 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Text, Boolean, Table, ForeignKey, UniqueConstraint
-from sqlalchemy import create_engine
+from sqlalchemy import Column, Integer, String, Text, Boolean, Table, ForeignKey, UniqueConstraint, BINARY
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import create_engine, event, func, and_, or_, Index
 from sqlalchemy.orm import sessionmaker, scoped_session, relationship, backref
-from sqlalchemy.dialects.mysql import BIGINT, MEDIUMINT, SMALLINT, INTEGER as INT, TIMESTAMP, ENUM
+from sqlalchemy.dialects.mysql import BIGINT, MEDIUMINT, SMALLINT, INTEGER as INT, TIMESTAMP, ENUM, \
+    insert as mysql_insert
 from sqlalchemy.sql import functions
 import configparser
+import contextlib
+import contextvars
+import threading
 from datetime import datetime
 import typing
 import secrets
+from hashlib import sha256
 
 from consts import ALL_CHARACTERS
 
@@ -102,12 +108,13 @@ class Channel(Base):
             )
 
             session.add(c)
+            session.flush()
+
             new = True
 
-        else:
+        elif c.name != finding_channel.name:
             c.name = finding_channel.name
 
-        session.flush()
         return c, new
 
     async def attach_webhook(self, channel):
@@ -190,13 +197,52 @@ class Message(Base):
     id = Column(INT(unsigned=True), primary_key=True)
 
     content = Column(String(2048), nullable=False, default='')
+    # set on plain text rows shared between reminders; null for anything built on the dashboard
+    content_hash = Column(BINARY(32), unique=True)
+    # last time a reminder took up the shared row. message_sweep leaves it alone for an hour after
+    interned_at = Column(TIMESTAMP)
 
     embed_id = Column(INT(unsigned=True), ForeignKey(Embed.id, ondelete='CASCADE'))
     embed = relationship(Embed)
 
+    @classmethod
+    def intern(cls, content: str) -> int:
+        # id of the plain text message with this content, creating it if no reminder uses it yet
+        digest = sha256(content.encode()).digest()
+
+        if engine.dialect.name == 'mysql':
+            # an existing row is stamped again, so message_sweep won't take it while the new reminders are added.
+            # LAST_INSERT_ID(id) hands its id back as though it had just been inserted
+            statement = mysql_insert(cls.__table__).values(content=content, content_hash=digest, interned_at=func.now())
+
+            return session.execute(statement.on_duplicate_key_update(
+                id=func.last_insert_id(cls.__table__.c.id), interned_at=func.now())).lastrowid
+
+        query = session.query(cls.id).filter(cls.content_hash == digest)
+        message_id = query.scalar()
+
+        if message_id is None:
+            message = cls(content=content, content_hash=digest, interned_at=datetime.now())
+
+            try:
+                with session.begin_nested():
+                    session.add(message)
+
+            except IntegrityError:
+                # inserted by another command since the lookup
+                return query.scalar()
+
+            message_id = message.id
+
+        return message_id
+
 
 class Reminder(Base):
     __tablename__ = 'reminders'
+    __table_args__ = (
+        # listings page through a channel's reminders in (time, id) order
+        Index('channel_time', 'channel_id', 'time', 'id'),
+    )
 
     id = Column(INT(unsigned=True), primary_key=True)
     uid = Column(String(64), default=lambda: Reminder.create_uid(), unique=True)
@@ -243,9 +289,82 @@ class Reminder(Base):
 
 Channel.reminders = relationship(Reminder, backref='channel', lazy='dynamic')
 
+# Reminder.message_content as a column expression, for listings that select rows without loading reminders
+reminder_content = func.coalesce(func.nullif(Message.content, ''), Embed.description, '')
+
+
+class ReminderPages:
+    """
+    Pages of a reminder listing in (time, id) order. Each page starts from the key of the last row of the page before,
+    so every page is one bounded query however far into the listing it is
+    """
+
+    def __init__(self, query, size: int, limit: typing.Optional[int] = None):
+        # query selects the listing's columns from reminders, unordered
+        self.query = query
+        self.size: int = size
+        self.limit: typing.Optional[int] = limit
+
+        # (time, id) of the first row of each page seen so far; page 1 starts at the beginning
+        self._starts: typing.Dict[int, typing.Optional[typing.Tuple[int, int]]] = {1: None}
+
+    def _start(self, page: int) -> typing.Optional[typing.Tuple[int, int]]:
+        if page not in self._starts:
+            # a page that hasn't been reached by paging, e.g 'page 5'. only the keys are read to find it
+            key = self.query.with_entities(Reminder.time, Reminder.id) \
+                .order_by(Reminder.time, Reminder.id) \
+                .offset((page - 1) * self.size) \
+                .first()
+
+            self._starts[page] = None if key is None else tuple(key)
+
+        return self._starts[page]
+
+    def count(self) -> int:
+        # rows in the whole listing, up to the limit
+        query = self.query.with_entities(Reminder.id)
+
+        if self.limit is not None:
+            query = query.limit(self.limit)
+
+        return query.count()
+
+    def fetch(self, page: int) -> typing.Tuple[list, bool]:
+        # the rows of a page, and whether there is another after it
+        size = self.size
+
+        if self.limit is not None:
+            size = min(size, self.limit - (page - 1) * self.size)
+
+        if size <= 0 or (page > 1 and self._start(page) is None):
+            return [], False
+
+        query = self.query.add_columns(Reminder.time, Reminder.id)
+
+        if (start := self._start(page)) is not None:
+            time, reminder_id = start
+            query = query.filter(or_(Reminder.time > time, and_(Reminder.time == time, Reminder.id >= reminder_id)))
+
+        rows = query.order_by(Reminder.time, Reminder.id).limit(size + 1).all()
+        more = len(rows) > size
+
+        self._starts[page + 1] = tuple(rows[size][-2:]) if more else None
+
+        if self.limit is not None and page * self.size >= self.limit:
+            more = False
+
+        # leave off the key columns added above
+        return [tuple(row[:-2]) for row in rows[:size]], more
+
 
 class Todo(Base):
     __tablename__ = 'todos'
+    __table_args__ = (
+        # one for each list: a user's own, a server's, and a channel's
+        Index('user_position', 'user_id', 'guild_id', 'channel_id', 'position'),
+        Index('guild_position', 'guild_id', 'channel_id', 'position'),
+        Index('channel_position', 'channel_id', 'position'),
+    )
 
     id = Column(INT(unsigned=True), primary_key=True)
 
@@ -254,6 +373,8 @@ class Todo(Base):
     channel_id = Column(INT(unsigned=True), ForeignKey(Channel.id, ondelete='SET NULL'))
 
     value = Column(String(2000), nullable=False)
+    # 1-based place in the list the item belongs to
+    position = Column(INT(unsigned=True), nullable=False, default=0)
 
 
 User.todo_list = relationship(Todo, backref='user', lazy='dynamic')
@@ -263,6 +384,9 @@ Channel.todo_list = relationship(Todo, backref='channel', lazy='dynamic')
 
 class Timer(Base):
     __tablename__ = 'timers'
+    __table_args__ = (
+        UniqueConstraint('owner', 'name', name='owner_name'),
+    )
 
     id = Column(INT(unsigned=True), primary_key=True)
 
@@ -298,12 +422,7 @@ class Language(Base):
     code = Column(String(2), nullable=False, unique=True)
 
     def get_string(self, string) -> str:
-        query = session.query(Strings) \
-            .filter(Strings.c.language.in_((self.code, 'EN'))) \
-            .order_by(Strings.c.language == 'EN') \
-            .filter(Strings.c.name == string)
-
-        return query.first().value
+        return STRING_CATALOG.get_string(self.code, string)
 
     def __getitem__(self, item):
         return self.get_string(item)
@@ -327,30 +446,103 @@ Guild.roles = relationship(Role, backref='guild', lazy='dynamic')
 
 config = configparser.ConfigParser()
 config.read('config.ini')
-user = config.get('MYSQL', 'USER')
-password: typing.Optional[str] = None
+if config.has_option('MYSQL', 'URL'):
+    # full SQLAlchemy URL, e.g. a local database for benchmarking
+    engine = create_engine(config.get('MYSQL', 'URL'))
 
-try:
-    password = config.get('MYSQL', 'PASSWD')
-except KeyError:
-    password = None
+else:
+    user = config.get('MYSQL', 'USER')
+    password: typing.Optional[str] = None
 
-host = config.get('MYSQL', 'HOST')
-database = config.get('MYSQL', 'DATABASE')
+    try:
+        password = config.get('MYSQL', 'PASSWD')
+    except KeyError:
+        password = None
 
-if password is not None:
-    engine = create_engine('mysql+pymysql://{user}:{passwd}@{host}/{db}?charset=utf8mb4'.format(
-        user=user, passwd=password, host=host, db=database))
+    host = config.get('MYSQL', 'HOST')
+    database = config.get('MYSQL', 'DATABASE')
 
-else:
-    engine = create_engine('mysql+pymysql://{user}@{host}/{db}?charset=utf8mb4'.format(
-        user=user, host=host, db=database))
+    # every command in flight holds a connection until it completes, on top of the ones the database threads use.
+    # running out means a query waits for one to be returned, which blocks whatever thread it was made on
+    connections = config.getint('DEFAULT', 'database_connections', fallback=32)
+    pool_size = config.getint('DEFAULT', 'database_threads', fallback=4) + connections
+
+    if password is not None:
+        engine = create_engine('mysql+pymysql://{user}:{passwd}@{host}/{db}?charset=utf8mb4'.format(
+            user=user, passwd=password, host=host, db=database), pool_size=pool_size, max_overflow=connections)
+
+    else:
+        engine = create_engine('mysql+pymysql://{user}@{host}/{db}?charset=utf8mb4'.format(
+            user=user, host=host, db=database), pool_size=pool_size, max_overflow=connections)
 
 Base.metadata.create_all(bind=engine)
 
 session_factory = sessionmaker(bind=engine)
-Session = scoped_session(session_factory)
-session = Session()
+
+# identifies the unit of work a command runs in. outside of one, sessions are scoped to the thread
+session_scope: contextvars.ContextVar = contextvars.ContextVar('session_scope', default=None)
+
+Session = scoped_session(session_factory, scopefunc=lambda: session_scope.get() or threading.get_ident())
+# the registry resolves to the session of the current command, so concurrent commands never share one
+session = Session
+
+
+def after_commit(callback: typing.Callable):
+    # run callback once the current transaction is committed. if it's rolled back instead, the callback is dropped
+    session.info.setdefault('after_commit', []).append(callback)
+
+
+@event.listens_for(session_factory, 'after_commit')
+def _run_after_commit(committed):
+    # releasing a savepoint fires this too, but nothing is durable until the outermost transaction commits
+    if committed.transaction.parent is None:
+        for callback in committed.info.pop('after_commit', ()):
+            callback()
+
+
+@event.listens_for(session_factory, 'after_soft_rollback')
+def _drop_after_commit(rolled_back, previous_transaction):
+    if previous_transaction.parent is None:
+        rolled_back.info.pop('after_commit', None)
+
+
+@contextlib.contextmanager
+def unit_of_work():
+    # give the enclosed command its own session, committed once when it completes
+    token = session_scope.set(object())
+
+    try:
+        yield
+
+    except BaseException:
+        session.rollback()
+        raise
+
+    else:
+        session.commit()
+
+    finally:
+        session.remove()
+        session_scope.reset(token)
+
+
+def run_transaction(method: typing.Callable):
+    # work inside a unit of work joins the command's transaction and is committed along with it
+    if session_scope.get() is not None:
+        return method()
+
+    # otherwise end the transaction here, so the thread's session holds no stale snapshot
+    try:
+        result = method()
+
+    except Exception:
+        session.rollback()
+        raise
+
+    else:
+        session.commit()
+        return result
+
 
 languages = session.query(Language.code).all()
 
@@ -361,5 +553,61 @@ Strings = Table('strings', Base.metadata,
                 Column('value', Text),
                 )
 
-ENGLISH_STRINGS: typing.Optional[Language] = session.query(Language) \
-    .filter(Language.code == config.get('DEFAULT', 'local_language')).first()
+
+class StringCatalog:
+    def __init__(self, fallback: str = 'EN'):
+        self.fallback: str = fallback
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._languages: typing.Dict[str, Language] = {}
+        self._strings: typing.Dict[str, typing.Dict[str, str]] = {}
+
+    def reload(self):
+        strings: typing.Dict[str, typing.Dict[str, str]] = {}
+
+        for code, name, value in session.query(Strings.c.language, Strings.c.name, Strings.c.value):
+            strings.setdefault(code, {})[name] = value
+
+        # resolve the fallback up front so a lookup is a single dict access
+        fallback = strings.get(self.fallback, {})
+        self._strings = {code: {**fallback, **values} for code, values in strings.items()}
+        self._strings.setdefault(self.fallback, fallback)
+
+        # detach the rows so commits on the shared session never expire them
+        loaded = session.query(Language).all()
+        for language in loaded:
+            session.expunge(language)
+
+        self._languages = {language.code: language for language in loaded}
+
+    def get_language(self, code: str) -> typing.Optional[Language]:
+        return self._languages.get(code)
+
+    def get_string(self, code: str, name: str) -> str:
+        try:
+            value = self._strings.get(code, self._strings[self.fallback])[name]
+
+        except KeyError:
+            # string added since the last reload; fetch it and remember it
+            self.misses += 1
+
+            value = session.query(Strings.c.value) \
+                .filter(Strings.c.language.in_((code, self.fallback))) \
+                .order_by(Strings.c.language == self.fallback) \
+                .filter(Strings.c.name == name) \
+                .first().value
+
+            self._strings.setdefault(code, dict(self._strings[self.fallback]))[name] = value
+
+        else:
+            self.hits += 1
+
+        return value
+
+
+STRING_CATALOG: StringCatalog = StringCatalog()
+STRING_CATALOG.reload()
+
+ENGLISH_STRINGS: typing.Optional[Language] = STRING_CATALOG.get_language(config.get('DEFAULT', 'local_language'))
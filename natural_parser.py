@@ -0,0 +1,275 @@
+import re
+import threading
+import typing
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from time import time as unix_time
+
+import dateparser
+from dateutil.relativedelta import relativedelta
+
+from consts import NATURAL_CACHE_SIZE, NATURAL_RELATIVE_TTL, DAY_LENGTH, MIN_INTERVAL, MAX_TIME
+from enums import CreateReminderResponse
+from timezones import TIMEZONES
+
+# a phrase is parsed against its base with the fraction of a second set to this. a result that keeps it moved along
+# with the base, so the phrase was relative ('in 2 hours', 'next week'); one that set its own time ('at 5pm') wasn't
+PROBE_MICROSECOND: int = 123457
+
+# unit spellings dateparser accepts after 'in N'; it rejects some obvious ones, like 'wks' and 'yrs'
+UNITS: typing.Dict[str, str] = {
+    **dict.fromkeys(('s', 'sec', 'secs', 'second', 'seconds'), 'seconds'),
+    **dict.fromkeys(('m', 'min', 'mins', 'minute', 'minutes'), 'minutes'),
+    **dict.fromkeys(('h', 'hr', 'hrs', 'hour', 'hours'), 'hours'),
+    **dict.fromkeys(('d', 'day', 'days'), 'days'),
+    **dict.fromkeys(('w', 'wk', 'week', 'weeks'), 'weeks'),
+    **dict.fromkeys(('mo', 'month', 'months'), 'months'),
+    **dict.fromkeys(('y', 'year', 'years'), 'years'),
+}
+
+# intervals repeat, so months and years get a fixed length rather than following the calendar
+INTERVAL_LENGTHS: typing.Dict[str, int] = {
+    'seconds': 1,
+    'minutes': 60,
+    'hours': 3600,
+    'days': DAY_LENGTH,
+    'weeks': DAY_LENGTH * 7,
+    'months': DAY_LENGTH * 30,
+    'years': DAY_LENGTH * 365,
+}
+
+WEEKDAYS: typing.Dict[str, int] = {
+    **dict.fromkeys(('monday', 'mon'), 0),
+    **dict.fromkeys(('tuesday', 'tue', 'tues'), 1),
+    **dict.fromkeys(('wednesday', 'wed'), 2),
+    **dict.fromkeys(('thursday', 'thu'), 3),
+    **dict.fromkeys(('friday', 'fri'), 4),
+    **dict.fromkeys(('saturday', 'sat'), 5),
+    **dict.fromkeys(('sunday', 'sun'), 6),
+}
+
+# a clock time needs am/pm or a colon; dateparser reads a bare 'at 5' as a date
+_CLOCK = r'(?:(?P<hour12>\d{1,2})(?::(?P<minute12>\d{2}))? ?(?P<meridiem>am|pm)|' \
+         r'(?P<hour>\d{1,2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?)'
+
+RELATIVE_REGEX = re.compile(r'in (?:(?P<count>\d+) ?|(?P<article>an?) )(?P<unit>{})'.format(
+    '|'.join(sorted(UNITS, key=len, reverse=True))))
+CLOCK_REGEX = re.compile(r'(?:(?P<tomorrow>tomorrow) )?(?:at )?{}(?P<after> tomorrow)?'.format(_CLOCK))
+WEEKDAY_REGEX = re.compile(r'(?:on )?(?P<weekday>{})'.format('|'.join(WEEKDAYS)))
+# one '<count> <unit>' term of an interval; terms may be separated by spaces, commas or 'and'
+INTERVAL_REGEX = re.compile(r'(?:(?P<count>\d+) ?|(?P<article>an?) )?(?P<unit>{})(?:,? and |, | |$)'.format(
+    '|'.join(sorted(UNITS, key=len, reverse=True))))
+ISO_REGEX = re.compile(
+    r'(?P<year>\d{4})-(?P<month>\d{2})-(?P<day>\d{2})(?:[ t](?P<hour>\d{2}):(?P<minute>\d{2})(?::(?P<second>\d{2}))?)?')
+
+
+def _clock_time(match) -> typing.Optional[typing.Tuple[int, int, int]]:
+    if match.group('meridiem') is not None:
+        hour = int(match.group('hour12'))
+        minute = int(match.group('minute12') or 0)
+
+        if not 1 <= hour <= 12:
+            return None
+
+        hour = hour % 12 + (12 if match.group('meridiem') == 'pm' else 0)
+        second = 0
+
+    else:
+        hour = int(match.group('hour'))
+        minute = int(match.group('minute'))
+        second = int(match.group('second') or 0)
+
+        if hour > 23:
+            return None
+
+    if minute > 59 or second > 59:
+        return None
+
+    return hour, minute, second
+
+
+def fast_parse(phrase: str, timezone: str, to_timezone: str, base: datetime) -> typing.Optional[datetime]:
+    """
+    Parse the common shapes of natural time ('in N units', 'at 5pm', 'tomorrow', weekdays and ISO dates) as dateparser
+    would with PREFER_DATES_FROM future. Returns None for anything else, which should go to dateparser
+    """
+    phrase = ' '.join(phrase.lower().split())
+    zone = TIMEZONES.zone(timezone)
+
+    try:
+        if (match := RELATIVE_REGEX.fullmatch(phrase)) is not None:
+            count = 1 if match.group('article') else int(match.group('count'))
+            unit = UNITS[match.group('unit')]
+
+            if unit in ('seconds', 'minutes', 'hours'):
+                # elapsed time, so a DST change in between doesn't stretch it
+                result = zone.localize(base) + timedelta(**{unit: count})
+
+            else:
+                result = zone.localize(base + relativedelta(**{unit: count}))
+
+        elif phrase == 'tomorrow':
+            result = zone.localize(base + timedelta(days=1))
+
+        elif (match := CLOCK_REGEX.fullmatch(phrase)) is not None:
+            if match.group('tomorrow') and match.group('after') or (clock := _clock_time(match)) is None:
+                return None
+
+            day = base.replace(hour=clock[0], minute=clock[1], second=clock[2], microsecond=0)
+
+            # an explicit day is kept as is; otherwise a time already gone today means tomorrow
+            if match.group('tomorrow') or match.group('after') or day < base:
+                day += timedelta(days=1)
+
+            result = zone.localize(day)
+
+        elif (match := WEEKDAY_REGEX.fullmatch(phrase)) is not None:
+            # today's weekday means the same day next week
+            days = (WEEKDAYS[match.group('weekday')] - base.weekday() - 1) % 7 + 1
+            result = zone.localize(datetime.combine(base.date() + timedelta(days=days), datetime.min.time()))
+
+        elif (match := ISO_REGEX.fullmatch(phrase)) is not None:
+            result = zone.localize(datetime(*(int(group or 0) for group in match.groups())))
+
+        else:
+            return None
+
+    except (ValueError, OverflowError):
+        return None
+
+    return result.astimezone(TIMEZONES.zone(to_timezone)).replace(tzinfo=None)
+
+
+def parse_interval(phrase: str) -> typing.Optional[int]:
+    """
+    Read what follows 'every' ('2 days', 'week', '1 hour 30 minutes') as a number of seconds. Returns None for anything
+    else, which should go to dateparser
+    """
+    phrase = ' '.join(phrase.lower().split())
+    position = 0
+    seconds = 0
+
+    while position < len(phrase):
+        if (match := INTERVAL_REGEX.match(phrase, position)) is None:
+            return None
+
+        count = 1 if match.group('count') is None else int(match.group('count'))
+        seconds += count * INTERVAL_LENGTHS[UNITS[match.group('unit')]]
+        position = match.end()
+
+    return seconds if position else None
+
+
+def interval_status(interval: int) -> typing.Optional[CreateReminderResponse]:
+    # why an interval can't be used, if it can't
+    if MIN_INTERVAL > interval:
+        return CreateReminderResponse.SHORT_INTERVAL
+
+    elif interval > MAX_TIME:
+        return CreateReminderResponse.LONG_INTERVAL
+
+    return None
+
+
+def probe_base(base: datetime) -> datetime:
+    return base.replace(microsecond=PROBE_MICROSECOND)
+
+
+def probe(phrase: str, timezone: typing.Optional[str], base: datetime, settings: typing.Optional[dict] = None) \
+        -> typing.Optional[datetime]:
+    # blocking; runs in a thread or a parser process. one parse, against the probe base so relative phrases show
+    settings = {} if settings is None else settings
+
+    if timezone is not None:
+        settings = {**settings, 'TIMEZONE': timezone}
+
+    return dateparser.parse(phrase, settings={**settings, 'RELATIVE_BASE': probe_base(base)})
+
+
+def warm_up():
+    # dateparser loads each language's data the first time it tries it, which takes seconds for all of them. a phrase
+    # no language understands makes it try every one, so that happens when a parser process starts, not on a command
+    dateparser.parse('in 1 hour', settings={'TIMEZONE': 'UTC', 'TO_TIMEZONE': 'UTC', 'PREFER_DATES_FROM': 'future'})
+    dateparser.parse('zzqx qqq')
+
+
+class ParserBusy(Exception):
+    pass
+
+
+class ParsedTime(typing.NamedTuple):
+    result: typing.Optional[datetime]
+    # set for relative phrases, whose result moves in step with the base they were parsed against
+    base: typing.Optional[datetime]
+    expires: float
+
+    def at(self, base: datetime) -> typing.Optional[datetime]:
+        if self.base is None:
+            return self.result
+
+        return self.result + (base - self.base)
+
+
+class NaturalTimeCache:
+    def __init__(self, max_size: int, relative_ttl: int):
+        self.max_size: int = max_size
+        self.relative_ttl: int = relative_ttl
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+        # read from the event loop and filled from the parsing threads
+        self._lock: threading.Lock = threading.Lock()
+        self._data: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def normalize(phrase: str) -> str:
+        return ' '.join(phrase.lower().split())
+
+    def get(self, phrase: str, timezone: typing.Optional[str]) -> typing.Optional[ParsedTime]:
+        key = (self.normalize(phrase), timezone)
+
+        with self._lock:
+            parsed: typing.Optional[ParsedTime] = self._data.get(key)
+
+            if parsed is None or parsed.expires <= unix_time():
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._data.move_to_end(key)
+
+            return parsed
+
+    def store(self, phrase: str, timezone: typing.Optional[str], base: datetime,
+              result: typing.Optional[datetime]) -> ParsedTime:
+        # result is what probe gave for base
+        now = unix_time()
+
+        if result is not None and result.microsecond == PROBE_MICROSECOND:
+            # months have different lengths, so a relative result is only trusted until the base's day ends
+            midnight = datetime.combine(base.date() + timedelta(days=1), datetime.min.time())
+
+            expires = now + min(self.relative_ttl, (midnight - base).total_seconds())
+            parsed = ParsedTime(result, probe_base(base), expires)
+
+        else:
+            # absolute phrases (and ones that never parse) can still change once the day or hour moves on, so only
+            # keep them until the current minute ends
+            parsed = ParsedTime(result, None, (now // 60 + 1) * 60)
+
+        with self._lock:
+            self._data[(self.normalize(phrase), timezone)] = parsed
+
+            if len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+        return parsed
+
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+
+        return self.hits / total if total else 0
+
+
+NATURAL_TIMES: NaturalTimeCache = NaturalTimeCache(NATURAL_CACHE_SIZE, NATURAL_RELATIVE_TTL)
@@ -0,0 +1,37 @@
+import typing
+
+# longest content Discord accepts in a message, and in an embed's description
+MESSAGE_LIMIT: int = 2000
+EMBED_LIMIT: int = 2048
+
+
+def paginate(lines: typing.Iterable[str], limit: int = MESSAGE_LIMIT) -> typing.Iterator[str]:
+    """
+    Join lines with newlines into pages no longer than limit, reading the lines lazily. A line too long for a page of
+    its own is split across as many as it needs
+    """
+    page: typing.List[str] = []
+    length = 0
+
+    for line in lines:
+        # the newline joining this line to the one before
+        needed = len(line) + (1 if page else 0)
+
+        if length + needed > limit and page:
+            yield '\n'.join(page)
+
+            page = []
+            length = 0
+            needed = len(line)
+
+        while needed > limit:
+            yield line[:limit]
+
+            line = line[limit:]
+            needed = len(line)
+
+        page.append(line)
+        length += needed
+
+    if page:
+        yield '\n'.join(page)
@@ -1,8 +1,10 @@
 import discord
 
 from enums import PermissionLevels, CreateReminderResponse
-from models import Guild, User, Language, session, ENGLISH_STRINGS, CommandRestriction, Role
+from models import Guild, User, Language, session, after_commit, ENGLISH_STRINGS, STRING_CATALOG
+from caches import GUILD_CACHE, USER_CACHE, RESTRICTION_CACHE, GuildSettings, UserSettings
 import typing
+from functools import partial
 
 
 # wrapper for command functions
@@ -15,7 +17,7 @@ class Command:
         self.permission_level = permission_level
         self.blacklists = blacklists
 
-    def check_permissions(self, member: discord.Member, guild_data: Guild):
+    def check_permissions(self, member: discord.Member, guild_id: int):
         if self.permission_level == PermissionLevels.UNRESTRICTED:
             return True
 
@@ -24,39 +26,69 @@ class Command:
                 return True
 
             else:
-                restrict = guild_data.command_restrictions \
-                    .filter(CommandRestriction.command == self.name) \
-                    .join(CommandRestriction.role) \
-                    .filter(Role.role.in_([x.id for x in member.roles]))
+                allowed = RESTRICTION_CACHE.allowed_roles(guild_id, self.name)
 
-                return restrict.count() != 0
+                return not allowed.isdisjoint(role.id for role in member.roles)
 
         elif self.permission_level == PermissionLevels.RESTRICTED:
             return member.guild_permissions.manage_guild
 
 
 class Preferences:
-    def __init__(self, guild: typing.Optional[Guild], user: User):
-        self.user: User = user
-        self.guild: Guild = guild
+    def __init__(self, guild: typing.Optional[GuildSettings], user: UserSettings):
+        # the guild and user rows are only loaded if a command actually needs them
+        self._guild_settings: typing.Optional[GuildSettings] = guild
+        self._guild: typing.Optional[Guild] = None
+
+        self._user_settings: UserSettings = user
+        self._user: typing.Optional[User] = None
 
         language_code: str = user.language or 'EN'
         timezone_code: str = user.timezone or ('UTC' if guild is None else guild.timezone)
         guild_timezone_code = None if guild is None else guild.timezone
 
-        self._language: typing.Optional[Language] = session.query(Language).filter(
-            Language.code == language_code).first() or ENGLISH_STRINGS
+        self._language: typing.Optional[Language] = STRING_CATALOG.get_language(language_code) or ENGLISH_STRINGS
         self._timezone: str = timezone_code
         self._guild_timezone: str = guild_timezone_code
         self._prefix: str = '$'
-        self.command_restrictions = None
 
         if guild is not None:
             self._prefix = guild.prefix
-            self.command_restrictions = guild.command_restrictions
 
         self._allowed_dm: bool = user.allowed_dm
 
+    # the rows load on first use with a query each, so commands touch them inside do_database. the ids and the DM
+    # channel below come from the cached settings instead
+    @property
+    def user(self) -> User:
+        if self._user is None:
+            self._user = session.query(User).get(self._user_settings.id)
+
+        return self._user
+
+    @property
+    def guild(self) -> typing.Optional[Guild]:
+        if self._guild is None and self._guild_settings is not None:
+            self._guild = session.query(Guild).get(self._guild_settings.id)
+
+        return self._guild
+
+    @property
+    def user_id(self) -> int:
+        return self._user_settings.id
+
+    @property
+    def guild_id(self) -> typing.Optional[int]:
+        return None if self._guild_settings is None else self._guild_settings.id
+
+    @property
+    def dm_channel(self) -> int:
+        return self._user_settings.dm_channel
+
+    @property
+    def command_restrictions(self):
+        return None if self.guild is None else self.guild.command_restrictions
+
     @property
     def language(self):
         return self._language
@@ -78,21 +110,30 @@ class Preferences:
         self.user.language = value
         self._language = value
 
+        # the cache only takes the new setting once the command's transaction has committed it
+        after_commit(partial(USER_CACHE.update, self.user.user, language=value))
+
     @timezone.setter
     def timezone(self, value):
         self.user.timezone = value
         self._timezone = value
 
+        after_commit(partial(USER_CACHE.update, self.user.user, timezone=value))
+
     @server_timezone.setter
     def server_timezone(self, value):
         self.guild.timezone = value
         self._guild_timezone = value
 
+        after_commit(partial(GUILD_CACHE.update, self.guild.guild, timezone=value))
+
     @prefix.setter
     def prefix(self, value):
         self.guild.prefix = value
         self._prefix = value
 
+        after_commit(partial(GUILD_CACHE.update, self.guild.guild, prefix=value))
+
 
 class ReminderInformation:
     def __init__(self, status: CreateReminderResponse, channel: discord.TextChannel = None, time: float = 0):
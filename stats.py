@@ -0,0 +1,182 @@
+import bisect
+import contextlib
+import contextvars
+import threading
+import typing
+from collections import deque
+from time import perf_counter
+
+from sqlalchemy import event
+
+# upper bounds, in seconds, of the latency buckets exported to Prometheus
+LATENCY_BUCKETS: typing.Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class RollingHistogram:
+    def __init__(self, window: int = 1024, buckets: typing.Sequence[float] = LATENCY_BUCKETS):
+        self.buckets: typing.Sequence[float] = buckets
+
+        # recent samples for percentiles, plus lifetime counts for scraping
+        self.samples: typing.Deque[float] = deque(maxlen=window)
+        self.bucket_counts: typing.List[int] = [0] * (len(buckets) + 1)
+        self.count: int = 0
+        self.total: float = 0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0
+
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def mean(self) -> float:
+        return sum(self.samples) / len(self.samples) if self.samples else 0
+
+
+class CommandMetrics:
+    def __init__(self):
+        self.command: typing.Optional[str] = None
+
+        self.sql_time: float = 0
+        self.queries: int = 0
+        self.api_calls: int = 0
+        # spent waiting on a reply from the user, which isn't counted as the command's own time
+        self.wait_time: float = 0
+
+
+class CommandStats:
+    def __init__(self):
+        self.wall_time: typing.Dict[str, RollingHistogram] = {}
+        self.sql_time: typing.Dict[str, RollingHistogram] = {}
+        self.queries: typing.Dict[str, RollingHistogram] = {}
+        self.api_calls: typing.Dict[str, RollingHistogram] = {}
+
+        self._current: contextvars.ContextVar = contextvars.ContextVar('command_metrics', default=None)
+        self._lock: threading.Lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def measure(self):
+        metrics = CommandMetrics()
+        token = self._current.set(metrics)
+        start = perf_counter()
+
+        try:
+            yield metrics
+
+        finally:
+            self._current.reset(token)
+
+            # messages that never reached a command aren't recorded
+            if metrics.command is not None:
+                self.record(metrics.command, metrics, perf_counter() - start - metrics.wait_time)
+
+    @contextlib.contextmanager
+    def waiting(self):
+        start = perf_counter()
+
+        try:
+            yield
+
+        finally:
+            if (metrics := self._current.get()) is not None:
+                metrics.wait_time += perf_counter() - start
+
+    def label(self, command: str):
+        if (metrics := self._current.get()) is not None:
+            metrics.command = command
+
+    def record(self, command: str, metrics: CommandMetrics, wall_time: float):
+        with self._lock:
+            for histograms, value in ((self.wall_time, wall_time),
+                                      (self.sql_time, metrics.sql_time),
+                                      (self.queries, metrics.queries),
+                                      (self.api_calls, metrics.api_calls)):
+                if command not in histograms:
+                    histograms[command] = RollingHistogram()
+
+                histograms[command].observe(value)
+
+    def count_query(self, duration: float):
+        # called from whichever thread ran the query; the context was carried over by do_database
+        if (metrics := self._current.get()) is not None:
+            metrics.sql_time += duration
+            metrics.queries += 1
+
+    def count_api_call(self):
+        if (metrics := self._current.get()) is not None:
+            metrics.api_calls += 1
+
+    def instrument_engine(self, engine):
+        @event.listens_for(engine, 'before_cursor_execute')
+        def _before_execute(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault('query_start', []).append(perf_counter())
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def _after_execute(conn, cursor, statement, parameters, context, executemany):
+            self.count_query(perf_counter() - conn.info['query_start'].pop())
+
+        @event.listens_for(engine, 'handle_error')
+        def _handle_error(context):
+            # a statement that fails never reaches after_cursor_execute, so its start is taken off the stack here
+            if context.connection is not None and (starts := context.connection.info.get('query_start')):
+                self.count_query(perf_counter() - starts.pop())
+
+    def summary(self) -> str:
+        lines = ['{:<12} {:>6} {:>9} {:>9} {:>9} {:>7} {:>6}'.format(
+            'command', 'count', 'p50 ms', 'p99 ms', 'sql ms', 'queries', 'api')]
+
+        with self._lock:
+            for command in sorted(self.wall_time, key=lambda c: -self.wall_time[c].count):
+                wall = self.wall_time[command]
+
+                lines.append('{:<12} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>7.1f} {:>6.1f}'.format(
+                    command,
+                    wall.count,
+                    wall.percentile(0.5) * 1000,
+                    wall.percentile(0.99) * 1000,
+                    self.sql_time[command].mean() * 1000,
+                    self.queries[command].mean(),
+                    self.api_calls[command].mean()))
+
+        return '\n'.join(lines)
+
+    def prometheus(self) -> str:
+        lines = []
+
+        with self._lock:
+            for name, histograms, description in (
+                    ('reminder_bot_command_seconds', self.wall_time, 'Wall time spent handling a command'),
+                    ('reminder_bot_command_sql_seconds', self.sql_time, 'Time a command spent in SQL queries')):
+                lines.append('# HELP {} {}'.format(name, description))
+                lines.append('# TYPE {} histogram'.format(name))
+
+                for command, histogram in sorted(histograms.items()):
+                    cumulative = 0
+
+                    for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                        cumulative += count
+                        lines.append('{}_bucket{{command="{}",le="{}"}} {}'.format(name, command, bound, cumulative))
+
+                    lines.append('{}_bucket{{command="{}",le="+Inf"}} {}'.format(name, command, histogram.count))
+                    lines.append('{}_sum{{command="{}"}} {}'.format(name, command, histogram.total))
+                    lines.append('{}_count{{command="{}"}} {}'.format(name, command, histogram.count))
+
+            for name, histograms, description in (
+                    ('reminder_bot_command_queries_total', self.queries, 'SQL queries issued by commands'),
+                    ('reminder_bot_command_api_calls_total', self.api_calls, 'Discord API calls made by commands')):
+                lines.append('# HELP {} {}'.format(name, description))
+                lines.append('# TYPE {} counter'.format(name))
+
+                for command, histogram in sorted(histograms.items()):
+                    lines.append('{}{{command="{}"}} {}'.format(name, command, int(histogram.total)))
+
+        return '\n'.join(lines) + '\n'
+
+
+COMMAND_STATS: CommandStats = CommandStats()
@@ -1,9 +1,12 @@
-import regex as re
-import pytz
+import re
+import typing
 from datetime import datetime
 from time import time as unix_time
 
 from enums import TimeExtractionTypes
+from timezones import TIMEZONES
+
+UNIT_LENGTHS: typing.Dict[str, int] = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
 
 
 class InvalidTime(Exception):
@@ -31,6 +34,37 @@ class TimeExtractor:
         else:
             self.process_type = TimeExtractionTypes.DISPLACEMENT
 
+    @classmethod
+    def extract_many(cls, strings: typing.Iterable[str], timezone=None, displacement: bool = False) \
+            -> typing.List[typing.Optional[int]]:
+        # extract_exact (or extract_displacement) for every string against a single reading of the clock. invalid
+        # strings give None rather than raising
+        now = unix_time()
+        date: typing.Optional[datetime] = None
+
+        results: typing.List[typing.Optional[int]] = []
+
+        for string in strings:
+            extractor = cls(string, timezone)
+
+            try:
+                if extractor.process_type == TimeExtractionTypes.EXPLICIT:
+                    if date is None:
+                        date = datetime.fromtimestamp(now, TIMEZONES.zone(timezone))
+
+                    t = extractor._process_explicit(date)
+
+                else:
+                    t = now + extractor._process_displacement()
+
+            except (InvalidTime, ValueError):
+                results.append(None)
+
+            else:
+                results.append(int(round(t - now)) if displacement else int(t))
+
+        return results
+
     def extract_exact(self) -> int:  # produce a timestamp
         return int(self._process_spaceless())
 
@@ -40,7 +74,7 @@ class TimeExtractor:
     def _process_spaceless(self) -> float:
         if self.process_type == TimeExtractionTypes.EXPLICIT:
             try:
-                d = self._process_explicit()
+                d = self._process_explicit(datetime.now(TIMEZONES.zone(self.timezone)))
             except ValueError:
                 raise InvalidTime()
             return d
@@ -49,9 +83,7 @@ class TimeExtractor:
             d = self._process_displacement()
             return unix_time() + d
 
-    def _process_explicit(self) -> float:  # processing times that dictate a specific time
-        date = datetime.now(pytz.timezone(self.timezone))
-
+    def _process_explicit(self, date: datetime) -> float:  # processing times that dictate a specific time
         for clump in self.time_string.split('-'):
             if '/' in clump:
                 a = clump.split('/')
@@ -75,43 +107,40 @@ class TimeExtractor:
         return date.timestamp()
 
     def _process_displacement(self) -> int:  # processing times that dictate a time relative to now
-        current_buffer = '0'
-        seconds = 0
-        minutes = 0
-        hours = 0
-        days = 0
+        string = self.time_string
 
-        for char in self.time_string:
+        # the short forms, bare seconds or a single unit, don't need scanning
+        if string.isdecimal():
+            full = int(string)
 
-            if char == 's':
-                seconds = int(current_buffer)
-                current_buffer = '0'
+        elif string[-1:] in UNIT_LENGTHS and string[:-1].isdecimal():
+            full = int(string[:-1]) * UNIT_LENGTHS[string[-1]]
 
-            elif char == 'm':
-                minutes = int(current_buffer)
-                current_buffer = '0'
+        else:
+            full = self._scan_displacement()
 
-            elif char == 'h':
-                hours = int(current_buffer)
-                current_buffer = '0'
+        if self.inverted:
+            full = -full
 
-            elif char == 'd':
-                days = int(current_buffer)
-                current_buffer = '0'
+        return full
 
-            else:
-                try:
-                    int(char)
-                    current_buffer += char
-                except ValueError:
-                    raise InvalidTime()
+    def _scan_displacement(self) -> int:
+        # a unit given twice keeps its last value, a unit with no digits is 0, and trailing digits are seconds
+        current_buffer = '0'
+        units: typing.Dict[str, int] = {}
 
-        full = seconds + (minutes * 60) + (hours * 3600) + (days * 86400) + int(current_buffer)
+        for char in self.time_string:
+            if char in UNIT_LENGTHS:
+                units[char] = int(current_buffer) * UNIT_LENGTHS[char]
+                current_buffer = '0'
 
-        if self.inverted:
-            full = -full
+            elif char.isdecimal():
+                current_buffer += char
 
-        return full
+            else:
+                raise InvalidTime()
+
+        return sum(units.values()) + int(current_buffer)
 
 
 class NaturalExtractor:
@@ -136,7 +165,7 @@ class NaturalExtractor:
     two_piece = [find_contents, find_time]
 
     def __init__(self, in_data, timezone=None):
-        self.time = datetime.now(pytz.timezone(timezone))
+        self.time = datetime.now(TIMEZONES.zone(timezone))
         self.time_provided = False
         self.interval_provided = False
 
@@ -0,0 +1,93 @@
+import bisect
+import typing
+
+import pytz
+
+# abbreviations people type that only mean one place. ones that mean several, like CST or IST, are left out; those
+# that pytz knows as zones itself (EST, MST, CET...) are matched by name
+ABBREVIATIONS: typing.Dict[str, str] = {
+    'pst': 'America/Los_Angeles',
+    'pdt': 'America/Los_Angeles',
+    'mdt': 'America/Denver',
+    'cdt': 'America/Chicago',
+    'edt': 'America/New_York',
+    'akst': 'America/Anchorage',
+    'akdt': 'America/Anchorage',
+    'cest': 'CET',
+    'eest': 'EET',
+    'west': 'WET',
+    'aest': 'Australia/Sydney',
+    'aedt': 'Australia/Sydney',
+    'acst': 'Australia/Adelaide',
+    'acdt': 'Australia/Adelaide',
+    'awst': 'Australia/Perth',
+    'nzst': 'Pacific/Auckland',
+    'nzdt': 'Pacific/Auckland',
+    'jst': 'Asia/Tokyo',
+    'kst': 'Asia/Seoul',
+    'hkt': 'Asia/Hong_Kong',
+    'sgt': 'Asia/Singapore',
+}
+
+
+class TimezoneIndex:
+    def __init__(self, names: typing.Iterable[str], cities: typing.Iterable[str],
+                 abbreviations: typing.Dict[str, str]):
+        # lowercased key to canonical zone name. full names win over city names, which win over abbreviations
+        self._names: typing.Dict[str, str] = {}
+
+        for key, name in abbreviations.items():
+            self._names[key] = name
+
+        city_zones: typing.Dict[str, typing.Set[str]] = {}
+
+        for name in cities:
+            city = name.rsplit('/', 1)[-1].lower()
+
+            if city != name.lower():
+                city_zones.setdefault(city, set()).add(name)
+                city_zones.setdefault(city.replace('_', ' '), set()).add(name)
+
+        # a city name shared by two zones can't be an alias for either
+        for city, zones in city_zones.items():
+            if len(zones) == 1:
+                self._names[city] = zones.pop()
+
+        for name in names:
+            self._names[name.lower()] = name
+
+        self._keys: typing.List[str] = sorted(self._names)
+
+        # pytz builds a zone from its tz database file the first time it's asked for one
+        self._zones: typing.Dict[str, pytz.BaseTzInfo] = {}
+
+    def resolve(self, query: str) -> typing.Optional[str]:
+        # the canonical name for a zone name, city or abbreviation in any case
+        return self._names.get(query.strip().lower())
+
+    def suggest(self, query: str, limit: int = 5) -> typing.List[str]:
+        # zones with a name or city starting with the query
+        prefix = query.strip().lower()
+        suggestions: typing.List[str] = []
+
+        if not prefix:
+            return suggestions
+
+        for key in self._keys[bisect.bisect_left(self._keys, prefix):]:
+            if not key.startswith(prefix) or len(suggestions) >= limit:
+                break
+
+            if (name := self._names[key]) not in suggestions:
+                suggestions.append(name)
+
+        return suggestions
+
+    def zone(self, name: str) -> pytz.BaseTzInfo:
+        try:
+            return self._zones[name]
+
+        except KeyError:
+            return self._zones.setdefault(name, pytz.timezone(name))
+
+
+TIMEZONES: TimezoneIndex = TimezoneIndex(pytz.all_timezones, pytz.common_timezones, ABBREVIATIONS)